@@ -0,0 +1,13 @@
+#!/usr/bin/env python
+
+import os
+import sys
+
+# Benchmark the hlt package MyBot runs with, rather than the pristine one next to this package
+BOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'mybot')
+if BOT_DIR not in sys.path:
+    sys.path.insert(0, BOT_DIR)
+
+from . import frames, suite
+from .frames import SyntheticGame
+from .suite import BENCHMARKS, measure, run_suite
@@ -0,0 +1,75 @@
+import argparse
+import itertools
+import json
+import sys
+
+from .suite import BENCHMARKS, run_suite
+
+
+def compare(results, baseline, tolerance):
+    """
+    :param results: The results of run_suite
+    :param baseline: Results of an earlier run_suite
+    :param tolerance: The fraction by which the median latency may grow
+    :return: (result, baseline result) for every benchmark which got slower than that
+    """
+    def key(result):
+        return result['benchmark'], result['size'], result['players'], result['ships']
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(key(result))
+        if before is None or result['median_us'] is None or before['median_us'] is None:
+            continue
+        if result['median_us'] > before['median_us'] * (1 + tolerance):
+            regressions.append((result, before))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Time the hlt hot paths on synthetic frames.")
+    parser.add_argument("--size", type=int, action="append", dest="sizes",
+                        help="map size; repeat for several (default: 32 and 64)")
+    parser.add_argument("--players", type=int, action="append", dest="players",
+                        help="number of players, 1 to 4; repeat for several (default: 2 and 4)")
+    parser.add_argument("--ships", type=int, action="append", dest="ships",
+                        help="number of ships of all players; repeat for several (default: 200)")
+    parser.add_argument("--benchmark", action="append", dest="names", choices=list(BENCHMARKS),
+                        metavar="NAME", help="only run this benchmark; repeat for several (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs of each benchmark (default: %(default)s)")
+    parser.add_argument("--turns", type=int, default=20, help="frames per synthetic game (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic games (default: %(default)s)")
+    parser.add_argument("--results", help="also write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with the results JSON of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="how much slower than the baseline counts as a regression (default: %(default)s)")
+    args = parser.parse_args()
+
+    configs = list(itertools.product(args.sizes or [32, 64], args.players or [2, 4], args.ships or [200]))
+    results = run_suite(configs, names=args.names, repeat=args.repeat, turns=args.turns, seed=args.seed)
+    if args.results:
+        with open(args.results, "w") as output:
+            json.dump(results, output, indent=2)
+
+    print("{:<34} {:>4} {:>7} {:>5} {:>11} {:>11} {:>10} {:>9}".format(
+        "benchmark", "size", "players", "ships", "median us", "min us", "blocks/op", "peak KiB"))
+    for result in results:
+        if result['median_us'] is None:
+            print("{benchmark:<34} {size:>4} {players:>7} {ships:>5} {:>11}".format("skipped", **result))
+            continue
+        print("{benchmark:<34} {size:>4} {players:>7} {ships:>5} {median_us:>11.3f} {min_us:>11.3f} "
+              "{blocks_per_op:>10.2f} {peak_kib:>9.1f}".format(**result))
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline), args.tolerance)
+        for result, before in regressions:
+            print("REGRESSION {benchmark} ({size}x{size}, {players} players, {ships} ships): "
+                  "{median_us:.3f} us".format(**result) + " vs {:.3f} us".format(before['median_us']))
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import json
+
+import numpy as np
+
+from engine.game import load_constants, turn_limit
+from engine.mapgen import generate_map
+
+# The (dx, dy) of north, south, east and west
+_OFFSETS = np.array([(0, -1), (0, 1), (1, 0), (-1, 0)], dtype=np.int64)
+
+
+class SyntheticGame:
+    """
+    Engine input for a game of a given size, to feed the hlt parsers without running bots.
+
+    The map and shipyards are the engine's (see engine.mapgen; 3 players get the 4 player
+    map with a seat left empty). Every player starts with its share of the ships spread
+    over the map and one dropoff. Each turn a ship moves to a random neighbor with
+    probability move_chance and mines its cell otherwise; full ships are emptied, standing in
+    for deposits. Ships never collide or spawn, so every frame carries the same ships.
+    """
+    def __init__(self, size=32, players=2, ships=100, turns=20, seed=0, move_chance=0.5, constants=None):
+        """
+        :param size: The map width and height
+        :param players: The number of players, 1 to 4
+        :param ships: The number of ships of all players together
+        :param turns: The number of frames to build
+        :param seed: The seed of the map and of the ships' moves
+        :param move_chance: The probability that a ship moves on a turn
+        :param constants: The game constants, defaulting to the kit's game_config.json
+        """
+        if not 1 <= players <= 4:
+            raise ValueError("players must be between 1 and 4")
+        self.width = self.height = size
+        self.players = players
+        self.constants = dict(constants if constants is not None else load_constants())
+        self.constants.update(MAX_TURNS=turn_limit(self.constants, size, size), map_width=size, map_height=size,
+                              game_seed=seed)
+        halite, shipyards = generate_map(size, size, 4 if players == 3 else players, seed, self.constants)
+        self.halite = halite
+        self.shipyards = shipyards[:players]
+
+        rng = np.random.default_rng(seed)
+        self.ship_ids = np.arange(ships, dtype=np.int64)
+        self.ship_owners = self.ship_ids % players
+        self.ship_xs = rng.integers(0, size, ships)
+        self.ship_ys = rng.integers(0, size, ships)
+        self.ship_halite = rng.integers(0, self.constants['MAX_ENERGY'], ships)
+        self.dropoffs = [(player_id, (x + size // 4) % size, y) for player_id, (x, y) in enumerate(self.shipyards)]
+
+        # The pre-game input, and the map part of it as read by GameMap._generate
+        self.map_text = self._map_text().encode()
+        self.init_text = self._init_text().encode()
+        # Every frame, and the changed cells part of it as read by GameMap._update
+        self.frames = []
+        self.cell_updates = []
+        previous_halite = self.halite.copy()
+        for turn in range(1, turns + 1):
+            players_text, cells_text = self._frame_text(turn, previous_halite)
+            self.frames.append((players_text + cells_text).encode())
+            self.cell_updates.append(cells_text.encode())
+            previous_halite = self.halite.copy()
+            self._step(rng, move_chance)
+
+    def _init_text(self, player_id=0):
+        """
+        :return: The pre-game input of a player
+        """
+        lines = [json.dumps(self.constants), "{} {}".format(self.players, player_id)]
+        lines += ["{} {} {}".format(owner, x, y) for owner, (x, y) in enumerate(self.shipyards)]
+        return "\n".join(lines) + "\n" + self._map_text()
+
+    def _map_text(self):
+        """
+        :return: The map part of the pre-game input
+        """
+        lines = ["{} {}".format(self.width, self.height)]
+        lines += [" ".join(map(str, row)) for row in self.halite.tolist()]
+        return "\n".join(lines) + "\n"
+
+    def _frame_text(self, turn, previous_halite):
+        """
+        :param previous_halite: The halite map as sent in the previous frame
+        :return: The input of a turn, as the players part and the changed cells part
+        """
+        lines = [str(turn)]
+        owners = self.ship_owners.tolist()
+        ships = np.column_stack((self.ship_ids, self.ship_xs, self.ship_ys, self.ship_halite)).tolist()
+        for player_id in range(self.players):
+            own = [ship for ship, owner in zip(ships, owners) if owner == player_id]
+            lines.append("{} {} 1 {}".format(player_id, len(own), self.constants['INITIAL_ENERGY']))
+            lines += ["{} {} {} {}".format(*ship) for ship in own]
+            lines.append("{} {} {}".format(*self.dropoffs[player_id]))
+
+        ys, xs = np.nonzero(self.halite != previous_halite)
+        cells = [str(len(xs))]
+        cells += ["{} {} {}".format(x, y, energy)
+                  for x, y, energy in zip(xs.tolist(), ys.tolist(), self.halite[ys, xs].tolist())]
+        return "\n".join(lines) + "\n", "\n".join(cells) + "\n"
+
+    def _step(self, rng, move_chance):
+        """
+        Move or mine with every ship.
+        """
+        moving = rng.random(len(self.ship_ids)) < move_chance
+        offsets = _OFFSETS[rng.integers(0, len(_OFFSETS), len(self.ship_ids))] * moving[:, None]
+        self.ship_xs = (self.ship_xs + offsets[:, 0]) % self.width
+        self.ship_ys = (self.ship_ys + offsets[:, 1]) % self.height
+
+        xs, ys = self.ship_xs[~moving], self.ship_ys[~moving]
+        cargo = self.ship_halite[~moving]
+        extracted = np.minimum(-(-self.halite[ys, xs] // self.constants['EXTRACT_RATIO']),
+                               self.constants['MAX_ENERGY'] - cargo)
+        self.halite[ys, xs] -= extracted
+        self.ship_halite[~moving] = cargo + extracted
+        self.ship_halite[self.ship_halite >= self.constants['MAX_ENERGY']] = 0
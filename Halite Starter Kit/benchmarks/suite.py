@@ -0,0 +1,323 @@
+import collections
+import gc
+import io
+import logging
+import statistics
+import sys
+import time
+import tracemalloc
+
+from hlt import constants
+from hlt.common import use_streams
+from hlt.game_map import ArrayGameMap, GameMap
+from hlt.networking import Game, send_commands
+from hlt.positionals import Direction, Position
+
+from .frames import SyntheticGame
+
+# Every benchmark by name: a function of a SyntheticGame returning (prepare, operations).
+# prepare is called untimed before every run and returns the function to time, which
+# performs the given number of operations.
+BENCHMARKS = collections.OrderedDict()
+
+
+def benchmark(name):
+    """
+    Register a benchmark under a name.
+    """
+    def register(function):
+        BENCHMARKS[name] = function
+        return function
+    return register
+
+
+class _NullStream:
+    """
+    An output stream which drops everything written to it.
+    """
+    def write(self, data):
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+def _start_game(synthetic, array_map=False, frames=0):
+    """
+    :param synthetic: The SyntheticGame
+    :param array_map: Whether to store the map in NumPy arrays
+    :param frames: The number of frames to read once the game is created
+    :return: The Game, with its streams left on the remaining frames
+    """
+    use_streams(io.BytesIO(synthetic.init_text + b"".join(synthetic.frames)), _NullStream())
+    game = Game(array_map=array_map)
+    for _ in range(frames):
+        game.update_frame()
+    return game
+
+
+def _map_generate(map_class):
+    """
+    :return: A benchmark of reading the map with map_class._generate
+    """
+    def prepare_benchmark(synthetic):
+        def prepare():
+            use_streams(io.BytesIO(synthetic.map_text), None)
+            return map_class._generate
+        return prepare, 1
+    return prepare_benchmark
+
+
+def _map_update(map_class):
+    """
+    :return: A benchmark of reading every frame's changed cells with map_class._update
+    """
+    def prepare_benchmark(synthetic):
+        def prepare():
+            use_streams(io.BytesIO(synthetic.map_text), None)
+            game_map = map_class._generate()
+            use_streams(io.BytesIO(b"".join(synthetic.cell_updates)), None)
+
+            def run():
+                for _ in synthetic.cell_updates:
+                    game_map._update()
+            return run
+        return prepare, len(synthetic.cell_updates)
+    return prepare_benchmark
+
+
+def _update_frame(array_map):
+    """
+    :return: A benchmark of reading every frame with Game.update_frame
+    """
+    def prepare_benchmark(synthetic):
+        def prepare():
+            game = _start_game(synthetic, array_map)
+
+            def run():
+                for _ in synthetic.frames:
+                    game.update_frame()
+            return run
+        return prepare, len(synthetic.frames)
+    return prepare_benchmark
+
+
+benchmark('GameMap._generate')(_map_generate(GameMap))
+benchmark('ArrayGameMap._generate')(_map_generate(ArrayGameMap))
+benchmark('GameMap._update')(_map_update(GameMap))
+benchmark('ArrayGameMap._update')(_map_update(ArrayGameMap))
+benchmark('Game.update_frame')(_update_frame(False))
+benchmark('Game.update_frame (array map)')(_update_frame(True))
+
+
+def _ship_targets(game):
+    """
+    :return: Every ship of the game paired with a cell some way off, the same every time
+    """
+    ships = game.ships.ships
+    positions = game.game_map.positions.positions
+    return [(ship, positions[(index * 7919) % len(positions)]) for index, ship in enumerate(ships)]
+
+
+@benchmark('GameMap.calculate_distance')
+def _calculate_distance(synthetic):
+    game = _start_game(synthetic, frames=1)
+    pairs = [(ship.position, target) for ship, target in _ship_targets(game)]
+    calculate_distance = game.game_map.calculate_distance
+
+    def prepare():
+        def run():
+            for source, target in pairs:
+                calculate_distance(source, target)
+        return run
+    return prepare, len(pairs)
+
+
+@benchmark('GameMap.naive_navigate')
+def _naive_navigate(synthetic):
+    game = _start_game(synthetic, frames=1)
+    game_map = game.game_map
+    pairs = [(ship, target) for ship, target in _ship_targets(game) if ship.owner == game.my_id]
+
+    def prepare():
+        # Back to the cells marked unsafe by update_frame
+        game_map._clear_marks()
+        game_map._mark_ships(game.ships)
+
+        def run():
+            for ship, target in pairs:
+                game_map.naive_navigate(ship, target)
+        return run
+    return prepare, len(pairs)
+
+
+def _position_pairs(synthetic):
+    """
+    :return: (interned position, plain position) pairs for every ship
+    """
+    game = _start_game(synthetic, frames=1)
+    return [(ship.position, Position(target.x, target.y)) for ship, target in _ship_targets(game)]
+
+
+@benchmark('Position.__add__')
+def _position_add(synthetic):
+    pairs = _position_pairs(synthetic)
+
+    def prepare():
+        def run():
+            for _, position in pairs:
+                position + position
+        return run
+    return prepare, len(pairs)
+
+
+@benchmark('FixedPosition.__sub__')
+def _fixed_position_sub(synthetic):
+    pairs = _position_pairs(synthetic)
+
+    def prepare():
+        def run():
+            for fixed, position in pairs:
+                fixed - position
+        return run
+    return prepare, len(pairs)
+
+
+@benchmark('Position.directional_offset')
+def _position_offset(synthetic):
+    pairs = _position_pairs(synthetic)
+    directions = Direction.get_all_cardinals()
+
+    def prepare():
+        def run():
+            for _, position in pairs:
+                for direction in directions:
+                    position.directional_offset(direction)
+        return run
+    return prepare, len(pairs) * len(directions)
+
+
+@benchmark('FixedPosition.directional_offset')
+def _fixed_position_offset(synthetic):
+    pairs = _position_pairs(synthetic)
+    directions = Direction.get_all_cardinals()
+
+    def prepare():
+        def run():
+            for fixed, _ in pairs:
+                for direction in directions:
+                    fixed.directional_offset(direction)
+        return run
+    return prepare, len(pairs) * len(directions)
+
+
+@benchmark('Ship.move')
+def _ship_move(synthetic):
+    game = _start_game(synthetic, frames=1)
+    ships = game.me.get_ships()
+    directions = Direction.get_all_cardinals() + [Direction.Still]
+
+    def prepare():
+        def run():
+            for index, ship in enumerate(ships):
+                ship.move(directions[index % len(directions)])
+        return run
+    return prepare, len(ships)
+
+
+@benchmark('send_commands')
+def _send_commands(synthetic):
+    game = _start_game(synthetic, frames=1)
+    directions = Direction.get_all_cardinals() + [Direction.Still]
+    commands = [ship.move(directions[index % len(directions)]) for index, ship in enumerate(game.me.get_ships())]
+
+    def prepare():
+        use_streams(None, _NullStream())
+
+        def run():
+            send_commands(commands)
+        return run
+    return prepare, 1
+
+
+def measure(prepare, operations, repeat=5):
+    """
+    Time a benchmark. A first run warms up the caches (e.g. PositionTable.get) untimed, the
+    others are timed with the garbage collector disabled, like timeit does; one more run is
+    traced with tracemalloc for the memory it needs.
+    :param prepare: The benchmark's prepare function
+    :param operations: The number of operations of one run
+    :param repeat: The number of timed runs
+    :return: A dict of the median and fastest latency per operation in microseconds, the net
+             allocated memory blocks per operation and the peak traced memory of a run in KiB
+    """
+    prepare()()
+    latencies = []
+    blocks = []
+    for _ in range(repeat):
+        run = prepare()
+        gc.collect()
+        gc.disable()
+        try:
+            allocated = sys.getallocatedblocks()
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            blocks.append(sys.getallocatedblocks() - allocated)
+        finally:
+            gc.enable()
+        latencies.append(elapsed / operations * 1e6)
+
+    run = prepare()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'median_us': statistics.median(latencies),
+        'min_us': min(latencies),
+        'blocks_per_op': statistics.median(blocks) / operations,
+        'peak_kib': peak / 1024,
+    }
+
+
+def run_suite(configs, names=None, repeat=5, turns=20, seed=0):
+    """
+    Run benchmarks on synthetic games of several sizes.
+    :param configs: (size, players, ships) tuples
+    :param names: The benchmarks to run, defaulting to all of them
+    :param repeat: The number of timed runs of each benchmark
+    :param turns: The number of frames of each synthetic game
+    :param seed: The seed of the synthetic games
+    :return: One result dict per benchmark and configuration, see measure. The measurements
+             are None for benchmarks with no operations in a configuration.
+    """
+    # Like logging.basicConfig in Game, so that no log file is written
+    root = logging.getLogger()
+    if not root.handlers:
+        root.addHandler(logging.NullHandler())
+    previous_streams = use_streams(None, None)
+    results = []
+    try:
+        for size, players, ships in configs:
+            synthetic = SyntheticGame(size, players, ships, turns=turns, seed=seed)
+            # The parsers read the map size from here
+            constants.load_constants(synthetic.constants)
+            constants.set_dimensions(size, size)
+            for name in names or BENCHMARKS:
+                prepare, operations = BENCHMARKS[name](synthetic)
+                result = {'benchmark': name, 'size': size, 'players': players, 'ships': ships}
+                if operations:
+                    result.update(measure(prepare, operations, repeat))
+                else:
+                    # Nothing to time, e.g. the ship benchmarks without ships
+                    result.update(median_us=None, min_us=None, blocks_per_op=None, peak_kib=None)
+                results.append(result)
+    finally:
+        use_streams(*previous_streams)
+    return results
+
@@ -0,0 +1,5 @@
+#!/usr/bin/env python
+
+from . import bots, game, mapgen
+from .bots import BotError, InProcessBot, SubprocessBot, connect
+from .game import Engine, load_constants
@@ -0,0 +1,29 @@
+import argparse
+import json
+
+from .bots import connect
+from .game import DEFAULT_CONFIG, Engine, load_constants
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m engine",
+                                     description="Play a headless Halite III game between bot commands.")
+    parser.add_argument("bots", nargs="+",
+                        help="bot scripts (*.py, run in-process if they share one hlt package) or shell commands, "
+                             "1, 2 or 4 of them")
+    parser.add_argument("--width", type=int, help="map width")
+    parser.add_argument("--height", type=int, help="map height")
+    parser.add_argument("--seed", type=int, help="map seed")
+    parser.add_argument("--turns", type=int, help="override the number of turns")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="game constants (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, help="seconds a bot may take per reply")
+    args = parser.parse_args()
+
+    connections = [connect(bot, timeout=args.timeout) for bot in args.bots]
+    engine = Engine(connections, width=args.width, height=args.height, seed=args.seed,
+                    constants=load_constants(args.config), turns=args.turns)
+    print(json.dumps(engine.run(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
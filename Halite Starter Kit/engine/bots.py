@@ -0,0 +1,232 @@
+import os
+import queue
+import selectors
+import shlex
+import subprocess
+import sys
+import threading
+import traceback
+
+
+class BotError(Exception):
+    """
+    Raised when a bot crashes, times out or sends something the engine cannot understand.
+    """
+    pass
+
+
+class SubprocessBot:
+    """
+    A bot running as a child process, talking to the engine over its stdin and stdout.
+    """
+    def __init__(self, command, cwd=None, timeout=None, stderr=subprocess.DEVNULL):
+        """
+        :param command: The shell command starting the bot
+        :param cwd: The working directory of the bot (where its log ends up)
+        :param timeout: Seconds the bot may take per reply, or None to wait forever.
+                        Relies on select() working on pipes, i.e. not on Windows.
+        :param stderr: Where the bot's stderr goes
+        """
+        self.command = command
+        self.timeout = timeout
+        self.process = subprocess.Popen(command, shell=True, cwd=cwd, stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE, stderr=stderr)
+        self._selector = None
+        if timeout is not None:
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.process.stdout, selectors.EVENT_READ)
+
+    def send(self, text):
+        """
+        :param text: Lines to write to the bot, newline terminated
+        """
+        try:
+            self.process.stdin.write(text.encode())
+            self.process.stdin.flush()
+        except OSError as error:
+            raise BotError("could not write to {!r}: {}".format(self.command, error))
+
+    def receive(self):
+        """
+        :return: The next line the bot wrote, without its newline
+        """
+        if self._selector is not None and not self._selector.select(self.timeout):
+            raise BotError("{!r} timed out".format(self.command))
+        line = self.process.stdout.readline()
+        if not line:
+            raise BotError("{!r} exited".format(self.command))
+        return line.decode().rstrip('\r\n')
+
+    def close(self):
+        """
+        Stop the bot: closing its stdin makes hlt bots exit on their own.
+        """
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        if self._selector is not None:
+            self._selector.close()
+
+
+class _QueueStream:
+    """
+    A binary stream on top of a queue of byte chunks, for in-process bots.
+    None in the queue stands for the end of the stream.
+    """
+    def __init__(self, timeout=None):
+        self.chunks = queue.Queue()
+        self.timeout = timeout
+        self._buffer = b""
+        self._closed = False
+
+    def write(self, data):
+        # Like any binary stream, do not hold on to the caller's buffer
+        self.chunks.put(bytes(data))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.chunks.put(None)
+
+    def readline(self):
+        """
+        :return: The next line including its newline, or b"" at the end of the stream
+        """
+        while b"\n" not in self._buffer and not self._closed:
+            try:
+                chunk = self.chunks.get(timeout=self.timeout)
+            except queue.Empty:
+                raise BotError("timed out")
+            if chunk is None:
+                self._closed = True
+            else:
+                self._buffer += chunk
+        line, separator, self._buffer = self._buffer.partition(b"\n")
+        return line + separator
+
+
+class InProcessBot:
+    """
+    A bot script built on hlt running in a thread of the engine's process.
+
+    The script is executed with __name__ set to "__main__" and hlt's engine traffic redirected
+    through in-memory queues (see hlt.common.use_streams), skipping process start-up and pipe
+    I/O. Unlike runpy, this leaves sys.modules['__main__'] alone, which other bot threads and
+    the process pool rely on. The script's directory is put on sys.path so that it imports
+    its own hlt package; bots sharing a process must therefore share one hlt package (connect
+    checks for that). Each bot thread logs to its own file (see hlt.common.isolate_logging),
+    in the working directory of the process.
+    """
+    def __init__(self, path, timeout=None):
+        """
+        :param path: The bot script, e.g. mybot/MyBot.py
+        :param timeout: Seconds the bot may take per reply, or None to wait forever
+        """
+        self.path = os.path.abspath(path)
+        with open(self.path) as source:
+            self._code = compile(source.read(), self.path, "exec")
+        self.timeout = timeout
+        self._input = _QueueStream()
+        self._output = _QueueStream(timeout)
+        directory = os.path.dirname(self.path)
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        self.thread = threading.Thread(target=self._run, name=self.path, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        from hlt import common
+        common.use_streams(self._input, self._output)
+        # Older hlt packages cannot keep the logs of bots sharing a process apart
+        if hasattr(common, 'isolate_logging'):
+            common.isolate_logging()
+        try:
+            exec(self._code, {"__name__": "__main__", "__file__": self.path})
+        except SystemExit:
+            pass
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self._output.close()
+
+    def send(self, text):
+        """
+        :param text: Lines to write to the bot, newline terminated
+        """
+        if not self.thread.is_alive():
+            raise BotError("{!r} exited".format(self.path))
+        self._input.write(text.encode())
+
+    def receive(self):
+        """
+        :return: The next line the bot wrote, without its newline
+        """
+        try:
+            line = self._output.readline()
+        except BotError:
+            raise BotError("{!r} timed out".format(self.path))
+        if not line:
+            raise BotError("{!r} exited".format(self.path))
+        return line.decode().rstrip('\r\n')
+
+    def close(self):
+        """
+        Stop the bot: the end of its input makes hlt bots exit on their own.
+        """
+        self._input.close()
+        self.thread.join(5)
+
+
+def _hlt_package(path):
+    """
+    :param path: A bot script
+    :return: The hlt package directory next to it, or None if there is none
+    """
+    package = os.path.realpath(os.path.join(os.path.dirname(os.path.abspath(path)), 'hlt'))
+    return package if os.path.isdir(package) else None
+
+
+def _imported_hlt_package():
+    """
+    :return: The directory of the hlt package this process imported or handed to an
+             in-process bot already, or None
+    """
+    module = sys.modules.get('hlt')
+    if module is not None and getattr(module, '__file__', None):
+        return os.path.realpath(os.path.dirname(module.__file__))
+    return _claimed_hlt_package
+
+
+# The hlt package of the in-process bots started so far, as their threads import it lazily
+_claimed_hlt_package = None
+
+
+def connect(bot, timeout=None, cwd=None):
+    """
+    A bot script is run in-process when the hlt package next to it is the one the process
+    uses, which is the case for the first one. Any other script, e.g. the previous version
+    of a bot in another directory, is run as a subprocess so that it gets its own hlt.
+    :param bot: A path to an hlt bot script, or a shell command
+    :param timeout: Seconds the bot may take per reply
+    :param cwd: The working directory of bot scripts run as subprocesses (where their log
+                ends up). Shell commands run in the working directory of the process, as
+                they may refer to paths relative to it.
+    :return: A connection the Engine can talk to
+    """
+    global _claimed_hlt_package
+    if bot.endswith(".py") and os.path.isfile(bot):
+        package = _hlt_package(bot)
+        imported = _imported_hlt_package()
+        if package is not None and imported in (None, package):
+            _claimed_hlt_package = package
+            return InProcessBot(bot, timeout=timeout)
+        command = "{} {}".format(shlex.quote(sys.executable), shlex.quote(os.path.abspath(bot)))
+        return SubprocessBot(command, cwd=cwd, timeout=timeout)
+    return SubprocessBot(bot, timeout=timeout)
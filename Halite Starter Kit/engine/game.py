@@ -0,0 +1,329 @@
+import json
+import os
+
+import numpy as np
+
+from .bots import BotError
+from .mapgen import generate_map
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'game_config.json')
+
+# Engine direction characters and the (dx, dy) they move by
+_DIRECTIONS = {'n': (0, -1), 's': (0, 1), 'e': (1, 0), 'w': (-1, 0), 'o': (0, 0)}
+
+
+def load_constants(path=DEFAULT_CONFIG):
+    """
+    :param path: A game_config.json file
+    :return: The game constants it holds
+    """
+    with open(path) as config:
+        return json.load(config)
+
+
+def turn_limit(constants, width, height):
+    """
+    The number of turns a game lasts, which grows with the map size like in the real engine.
+    """
+    size = max(width, height)
+    low, high = constants['MIN_TURN_THRESHOLD'], constants['MAX_TURN_THRESHOLD']
+    fraction = min(max((size - low) / (high - low), 0.0), 1.0)
+    return int(constants['MIN_TURNS'] + fraction * (constants['MAX_TURNS'] - constants['MIN_TURNS']))
+
+
+class Engine:
+    """
+    A headless stand-in for the Halite III engine.
+
+    Plays one game between bots speaking the engine's line protocol (see hlt.networking),
+    following the rules set by game_config.json: spawning, dropoff construction, move costs,
+    collisions, mining, inspiration and deposits. Ships are kept as NumPy arrays so that each
+    turn is processed with a handful of vectorized operations.
+    """
+    def __init__(self, bots, width=None, height=None, seed=None, constants=None, turns=None):
+        """
+        :param bots: One bot connection per player, see SubprocessBot
+        :param width: The map width, defaulting to DEFAULT_MAP_WIDTH
+        :param height: The map height, defaulting to DEFAULT_MAP_HEIGHT
+        :param seed: The map seed
+        :param constants: The game constants, defaulting to the kit's game_config.json
+        :param turns: The number of turns, defaulting to what the map size calls for
+        """
+        self.bots = bots
+        self.constants = dict(constants if constants is not None else load_constants())
+        self.width = width or self.constants['DEFAULT_MAP_WIDTH']
+        self.height = height or self.constants['DEFAULT_MAP_HEIGHT']
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(4), 'little')
+        self.max_turns = turns or turn_limit(self.constants, self.width, self.height)
+        self.constants.update(MAX_TURNS=self.max_turns, map_width=self.width, map_height=self.height,
+                              game_seed=self.seed)
+
+        num_players = len(bots)
+        self.halite, self.shipyards = generate_map(self.width, self.height, num_players, self.seed, self.constants)
+        self.structure_owners = np.full((self.height, self.width), -1, dtype=np.int64)
+        for player_id, (x, y) in enumerate(self.shipyards):
+            self.structure_owners[y, x] = player_id
+        self.dropoffs = [[] for _ in range(num_players)]
+        self.banks = np.full(num_players, self.constants['INITIAL_ENERGY'], dtype=np.int64)
+        self.names = [None] * num_players
+        self.alive = [True] * num_players
+        self.last_turn_alive = [0] * num_players
+        self.turn = 0
+
+        # One entry per ship
+        self.ship_ids = np.empty(0, dtype=np.int64)
+        self.ship_owners = np.empty(0, dtype=np.int64)
+        self.ship_xs = np.empty(0, dtype=np.int64)
+        self.ship_ys = np.empty(0, dtype=np.int64)
+        self.ship_halite = np.empty(0, dtype=np.int64)
+        self._next_ship_id = 0
+        self._next_dropoff_id = 0
+
+    def _init_text(self, player_id):
+        """
+        :return: The pre-game input of a player
+        """
+        lines = [json.dumps(self.constants), "{} {}".format(len(self.bots), player_id)]
+        lines += ["{} {} {}".format(owner, x, y) for owner, (x, y) in enumerate(self.shipyards)]
+        lines.append("{} {}".format(self.width, self.height))
+        lines += [" ".join(map(str, row)) for row in self.halite.tolist()]
+        return "\n".join(lines) + "\n"
+
+    def _frame_text(self, previous_halite):
+        """
+        :param previous_halite: The halite map as sent in the previous frame
+        :return: The input of this turn, which is the same for every player
+        """
+        lines = [str(self.turn)]
+        owners = self.ship_owners.tolist()
+        ships = np.column_stack((self.ship_ids, self.ship_xs, self.ship_ys, self.ship_halite)).tolist()
+        for player_id in range(len(self.bots)):
+            own = [ship for ship, owner in zip(ships, owners) if owner == player_id]
+            lines.append("{} {} {} {}".format(player_id, len(own), len(self.dropoffs[player_id]),
+                                              self.banks[player_id]))
+            lines += ["{} {} {} {}".format(*ship) for ship in own]
+            lines += ["{} {} {}".format(*dropoff) for dropoff in self.dropoffs[player_id]]
+
+        ys, xs = np.nonzero(self.halite != previous_halite)
+        lines.append(str(len(xs)))
+        lines += ["{} {} {}".format(x, y, energy)
+                  for x, y, energy in zip(xs.tolist(), ys.tolist(), self.halite[ys, xs].tolist())]
+        return "\n".join(lines) + "\n"
+
+    def _eliminate(self, player_id):
+        """
+        Stop talking to a bot. Its ships stay on the map but never act again.
+        """
+        self.alive[player_id] = False
+        self.bots[player_id].close()
+
+    def _parse_commands(self, player_id, line):
+        """
+        :return: A tuple (moves as {ship id: direction}, ship ids to turn into dropoffs, whether to spawn)
+        """
+        owned = set(self.ship_ids[self.ship_owners == player_id].tolist())
+        tokens = line.split()
+        moves, constructs, spawn = {}, [], False
+        position = 0
+        try:
+            while position < len(tokens):
+                command = tokens[position]
+                if command == 'g':
+                    spawn = True
+                    position += 1
+                elif command == 'm':
+                    ship_id, direction = int(tokens[position + 1]), _DIRECTIONS[tokens[position + 2]]
+                    if ship_id not in owned or ship_id in moves:
+                        raise BotError("cannot move ship {}".format(ship_id))
+                    moves[ship_id] = direction
+                    position += 3
+                elif command == 'c':
+                    ship_id = int(tokens[position + 1])
+                    if ship_id not in owned:
+                        raise BotError("cannot convert ship {}".format(ship_id))
+                    constructs.append(ship_id)
+                    position += 2
+                else:
+                    raise BotError("unknown command {!r}".format(command))
+        except (IndexError, KeyError, ValueError) as error:
+            raise BotError("malformed commands {!r}: {}".format(line, error))
+        return moves, constructs, spawn
+
+    def _inspired(self):
+        """
+        :return: For every ship, whether enough opponent ships are close enough to inspire it
+        """
+        if not self.constants['INSPIRATION_ENABLED'] or len(self.ship_ids) == 0:
+            return np.zeros(len(self.ship_ids), dtype=bool)
+        dx = np.abs(self.ship_xs[:, None] - self.ship_xs[None, :])
+        dy = np.abs(self.ship_ys[:, None] - self.ship_ys[None, :])
+        distances = np.minimum(dx, self.width - dx) + np.minimum(dy, self.height - dy)
+        opponents = self.ship_owners[:, None] != self.ship_owners[None, :]
+        close = opponents & (distances <= self.constants['INSPIRATION_RADIUS'])
+        return close.sum(axis=1) >= self.constants['INSPIRATION_SHIP_COUNT']
+
+    def _keep_ships(self, keep, *extra):
+        """
+        Drop the ships where keep is False.
+        :param extra: Per-ship arrays to filter along with the ships
+        :return: The filtered extra arrays
+        """
+        self.ship_ids = self.ship_ids[keep]
+        self.ship_owners = self.ship_owners[keep]
+        self.ship_xs = self.ship_xs[keep]
+        self.ship_ys = self.ship_ys[keep]
+        self.ship_halite = self.ship_halite[keep]
+        return [array[keep] for array in extra]
+
+    def _process(self, commands):
+        """
+        Apply the commands of every player and advance the game by one turn.
+        :param commands: {player id: parsed commands}
+        """
+        constants = self.constants
+        count = len(self.ship_ids)
+        rows = {ship_id: row for row, ship_id in enumerate(self.ship_ids.tolist())}
+        dx = np.zeros(count, dtype=np.int64)
+        dy = np.zeros(count, dtype=np.int64)
+        keep = np.ones(count, dtype=bool)
+
+        for player_id, (moves, constructs, _) in commands.items():
+            for ship_id, (x_offset, y_offset) in moves.items():
+                dx[rows[ship_id]] = x_offset
+                dy[rows[ship_id]] = y_offset
+            for ship_id in constructs:
+                row = rows[ship_id]
+                x, y = self.ship_xs[row], self.ship_ys[row]
+                cost = constants['DROPOFF_COST'] - self.ship_halite[row] - self.halite[y, x]
+                if self.structure_owners[y, x] == -1 and self.banks[player_id] >= cost:
+                    self.banks[player_id] -= cost
+                    self.halite[y, x] = 0
+                    self.structure_owners[y, x] = player_id
+                    self.dropoffs[player_id].append((self._next_dropoff_id, int(x), int(y)))
+                    self._next_dropoff_id += 1
+                    keep[row] = False
+
+        # Moves: a ship which cannot pay to leave its cell stays
+        ratios = np.where(self._inspired(), constants['INSPIRED_MOVE_COST_RATIO'], constants['MOVE_COST_RATIO'])
+        costs = self.halite[self.ship_ys, self.ship_xs] // ratios
+        moved = ((dx != 0) | (dy != 0)) & (self.ship_halite >= costs) & keep
+        self.ship_halite -= np.where(moved, costs, 0)
+        self.ship_xs = (self.ship_xs + dx * moved) % self.width
+        self.ship_ys = (self.ship_ys + dy * moved) % self.height
+        moved, = self._keep_ships(keep, moved)
+
+        # Spawns land on the shipyard, and may collide there
+        spawned = np.zeros(len(self.ship_ids), dtype=bool)
+        for player_id, (_, _, spawn) in commands.items():
+            if spawn and self.banks[player_id] >= constants['NEW_ENTITY_ENERGY_COST']:
+                self.banks[player_id] -= constants['NEW_ENTITY_ENERGY_COST']
+                x, y = self.shipyards[player_id]
+                self.ship_ids = np.append(self.ship_ids, self._next_ship_id)
+                self.ship_owners = np.append(self.ship_owners, player_id)
+                self.ship_xs = np.append(self.ship_xs, x)
+                self.ship_ys = np.append(self.ship_ys, y)
+                self.ship_halite = np.append(self.ship_halite, 0)
+                moved = np.append(moved, False)
+                spawned = np.append(spawned, True)
+                self._next_ship_id += 1
+
+        # Collisions destroy every ship involved. Their cargo goes to the owner of the
+        # structure they collided on, or is dropped on the cell.
+        cells = self.ship_ys * self.width + self.ship_xs
+        _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+        crashed = counts[inverse] > 1
+        if crashed.any():
+            xs, ys, cargo = self.ship_xs[crashed], self.ship_ys[crashed], self.ship_halite[crashed]
+            structure_owners = self.structure_owners[ys, xs]
+            on_structure = structure_owners >= 0
+            np.add.at(self.banks, structure_owners[on_structure], cargo[on_structure])
+            np.add.at(self.halite, (ys[~on_structure], xs[~on_structure]), cargo[~on_structure])
+            moved, spawned = self._keep_ships(~crashed, moved, spawned)
+
+        # Deposits on the ship owner's structures
+        structure_owners = self.structure_owners[self.ship_ys, self.ship_xs]
+        home = structure_owners == self.ship_owners
+        np.add.at(self.banks, self.ship_owners[home], self.ship_halite[home])
+        self.ship_halite[home] = 0
+
+        # Mining by ships which stayed on a plain cell
+        mining = ~moved & ~spawned & (structure_owners == -1)
+        inspired = self._inspired()[mining]
+        xs, ys, cargo = self.ship_xs[mining], self.ship_ys[mining], self.ship_halite[mining]
+        cell_halite = self.halite[ys, xs]
+        ratios = np.where(inspired, constants['INSPIRED_EXTRACT_RATIO'], constants['EXTRACT_RATIO'])
+        extracted = np.minimum(-(-cell_halite // ratios), constants['MAX_ENERGY'] - cargo)
+        bonus = np.where(inspired, (extracted * constants['INSPIRED_BONUS_MULTIPLIER']).astype(np.int64), 0)
+        self.halite[ys, xs] -= extracted
+        self.ship_halite[mining] = np.minimum(cargo + extracted + bonus, constants['MAX_ENERGY'])
+
+    def run(self):
+        """
+        Play the game to the end.
+        :return: The results, see results()
+        """
+        for player_id, bot in enumerate(self.bots):
+            try:
+                bot.send(self._init_text(player_id))
+            except BotError:
+                self._eliminate(player_id)
+        for player_id, bot in enumerate(self.bots):
+            if self.alive[player_id]:
+                try:
+                    self.names[player_id] = bot.receive()
+                except BotError:
+                    self._eliminate(player_id)
+
+        previous_halite = self.halite.copy()
+        for turn in range(1, self.max_turns + 1):
+            self.turn = turn
+            frame = self._frame_text(previous_halite)
+            previous_halite = self.halite.copy()
+            players = [player_id for player_id, alive in enumerate(self.alive) if alive]
+            # Send the frame to everybody first, so that bots think in parallel
+            for player_id in players:
+                try:
+                    self.bots[player_id].send(frame)
+                except BotError:
+                    self._eliminate(player_id)
+            commands = {}
+            for player_id in players:
+                if self.alive[player_id]:
+                    try:
+                        commands[player_id] = self._parse_commands(player_id, self.bots[player_id].receive())
+                        self.last_turn_alive[player_id] = self.turn
+                    except BotError:
+                        self._eliminate(player_id)
+            self._process(commands)
+
+            if sum(self.alive) <= (1 if len(self.bots) > 1 else 0):
+                break
+
+        for player_id, alive in enumerate(self.alive):
+            if alive:
+                self.bots[player_id].close()
+        return self.results()
+
+    def results(self):
+        """
+        :return: The results in the shape of the real engine's --results-as-json output
+        """
+        order = sorted(range(len(self.bots)),
+                       key=lambda player_id: (self.last_turn_alive[player_id], self.banks[player_id]),
+                       reverse=True)
+        return {
+            'map_width': self.width,
+            'map_height': self.height,
+            'map_seed': self.seed,
+            'turns': self.turn,
+            'stats': {
+                str(player_id): {
+                    'rank': order.index(player_id) + 1,
+                    'score': int(self.banks[player_id]),
+                    'name': self.names[player_id],
+                    'ships': int((self.ship_owners == player_id).sum()),
+                    'dropoffs': len(self.dropoffs[player_id]),
+                }
+                for player_id in range(len(self.bots))
+            },
+        }
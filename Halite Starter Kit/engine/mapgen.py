@@ -0,0 +1,85 @@
+import numpy as np
+
+
+def _smooth_noise(rng, height, width, period):
+    """
+    Random values on a grid of the given period, bilinearly interpolated to every cell.
+    :return: A (height, width) array of values in [0, 1)
+    """
+    coarse = rng.random((height // period + 2, width // period + 2))
+    ys = np.arange(height) / period
+    xs = np.arange(width) / period
+    y0 = ys.astype(int)
+    x0 = xs.astype(int)
+    fy = (ys - y0)[:, None]
+    fx = xs - x0
+    top = coarse[y0][:, x0] * (1 - fx) + coarse[y0][:, x0 + 1] * fx
+    bottom = coarse[y0 + 1][:, x0] * (1 - fx) + coarse[y0 + 1][:, x0 + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def _fractal_tile(rng, height, width, constants):
+    """
+    Fractal value noise for one player's tile, scaled like the engine's halite maps.
+    :return: A (height, width) integer array of halite
+    """
+    noise = np.zeros((height, width))
+    period = max(height, width)
+    amplitude = 1.0
+    while period >= 1:
+        noise += amplitude * _smooth_noise(rng, height, width, period)
+        amplitude *= constants['PERSISTENCE']
+        period //= 2
+    noise = (noise - noise.min()) / max(noise.max() - noise.min(), 1e-9)
+    noise **= constants['FACTOR_EXP_1']
+    peak = rng.integers(constants['MIN_CELL_PRODUCTION'], constants['MAX_CELL_PRODUCTION'] + 1)
+    return (noise * peak).astype(np.int64)
+
+
+def _tiling(num_players):
+    """
+    :return: The number of tile rows and columns for a player count
+    """
+    if num_players == 1:
+        return 1, 1
+    if num_players == 2:
+        return 1, 2
+    if num_players == 4:
+        return 2, 2
+    raise ValueError("Only 1, 2 or 4 players are supported, not {}".format(num_players))
+
+
+def generate_map(width, height, num_players, seed, constants):
+    """
+    Generate a symmetric halite map along with the shipyard of every player.
+    Every player gets a tile of the same noise, mirrored so that the map wraps evenly.
+    :param width: The map width
+    :param height: The map height
+    :param num_players: The number of players (1, 2 or 4)
+    :param seed: The seed of the random generator
+    :param constants: The game constants
+    :return: A (height, width) halite array and a list of (x, y) shipyard positions
+    """
+    rows, columns = _tiling(num_players)
+    if width % columns or height % rows:
+        raise ValueError("A {}x{} map cannot be split between {} players".format(width, height, num_players))
+    tile_width = width // columns
+    tile_height = height // rows
+
+    rng = np.random.default_rng(seed)
+    tile = _fractal_tile(rng, tile_height, tile_width, constants)
+    halite = np.empty((height, width), dtype=np.int64)
+    shipyards = []
+    for row in range(rows):
+        for column in range(columns):
+            mirrored = tile[::-1] if row % 2 else tile
+            mirrored = mirrored[:, ::-1] if column % 2 else mirrored
+            halite[row * tile_height:(row + 1) * tile_height,
+                   column * tile_width:(column + 1) * tile_width] = mirrored
+            x = tile_width // 2 if column % 2 == 0 else tile_width - 1 - tile_width // 2
+            y = tile_height // 2 if row % 2 == 0 else tile_height - 1 - tile_height // 2
+            shipyards.append((column * tile_width + x, row * tile_height + y))
+
+    for x, y in shipyards:
+        halite[y, x] = 0
+    return halite, shipyards
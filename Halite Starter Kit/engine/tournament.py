@@ -0,0 +1,121 @@
+import argparse
+import concurrent.futures
+import json
+import os
+import statistics
+
+from .bots import connect
+from .game import DEFAULT_CONFIG, Engine, load_constants
+
+
+def play_game(bots, seed, width, height, turns=None, constants=None, timeout=None, log_dir=None):
+    """
+    Play one game. Runs in a worker process of run_tournament.
+    :param bots: The bots of each seat, see connect
+    :param log_dir: If given, the working directory of the game, where the bots' logs end up
+    :return: The engine results, with the seed order of bots under 'bots'
+    """
+    previous_dir = os.getcwd()
+    if log_dir is not None:
+        os.makedirs(log_dir, exist_ok=True)
+    try:
+        # Connect before moving, as shell commands and bot paths may be relative
+        connections = [connect(bot, timeout, cwd=log_dir) for bot in bots]
+        if log_dir is not None:
+            os.chdir(log_dir)
+        engine = Engine(connections, width=width, height=height, seed=seed, constants=constants, turns=turns)
+        results = engine.run()
+    finally:
+        os.chdir(previous_dir)
+    results['bots'] = list(bots)
+    return results
+
+
+def run_tournament(bots, games, seed=0, sizes=(32,), turns=None, constants=None, timeout=None, workers=None,
+                   log_dir=None):
+    """
+    Play seeded games in parallel across a process pool.
+
+    Game i uses map seed seed + i and map size sizes[i % len(sizes)], and rotates the seats so
+    that every bot plays every seat equally often.
+    :param bots: The competing bots, see connect
+    :param games: The number of games
+    :param workers: The number of worker processes, defaulting to the number of cores
+    :param log_dir: If given, game i runs in its own directory log_dir/game-<i>, so that the
+                    logs of games played at the same time do not overwrite each other
+    :return: The results of every game, in order
+    """
+    constants = constants if constants is not None else load_constants()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for game in range(games):
+            shift = game % len(bots)
+            seats = bots[shift:] + bots[:shift]
+            size = sizes[game % len(sizes)]
+            game_dir = None if log_dir is None else os.path.abspath(os.path.join(log_dir, "game-{}".format(game)))
+            futures.append(pool.submit(play_game, seats, seed + game, size, size, turns, constants, timeout,
+                                       game_dir))
+        return [future.result() for future in futures]
+
+
+def summarize(bots, results):
+    """
+    Aggregate game results per bot.
+    :param bots: The competing bots, as given to run_tournament
+    :param results: The results of run_tournament
+    :return: {bot: {'games', 'wins', 'win_rate', 'mean_score', 'median_score', 'stdev_score', 'mean_rank'}}
+    """
+    scores = {bot: [] for bot in bots}
+    ranks = {bot: [] for bot in bots}
+    for result in results:
+        for seat, bot in enumerate(result['bots']):
+            stats = result['stats'][str(seat)]
+            scores[bot].append(stats['score'])
+            ranks[bot].append(stats['rank'])
+
+    summary = {}
+    for bot in bots:
+        played = len(scores[bot])
+        wins = ranks[bot].count(1)
+        summary[bot] = {
+            'games': played,
+            'wins': wins,
+            'win_rate': wins / played if played else 0.0,
+            'mean_score': statistics.mean(scores[bot]) if played else 0.0,
+            'median_score': statistics.median(scores[bot]) if played else 0.0,
+            'stdev_score': statistics.stdev(scores[bot]) if played > 1 else 0.0,
+            'mean_rank': statistics.mean(ranks[bot]) if played else 0.0,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m engine.tournament",
+                                     description="Play many seeded headless games in parallel and report win rates.")
+    parser.add_argument("bots", nargs="+",
+                        help="bot scripts (*.py, run in-process if they share one hlt package) or shell commands")
+    parser.add_argument("--games", type=int, default=100, help="number of games (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game (default: %(default)s)")
+    parser.add_argument("--size", type=int, action="append", dest="sizes",
+                        help="map size; repeat to cycle through several (default: 32)")
+    parser.add_argument("--turns", type=int, help="override the number of turns")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="game constants (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, help="seconds a bot may take per reply")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--results", help="also write every game's results to this JSON file")
+    parser.add_argument("--logs", default="tournament-logs",
+                        help="directory holding one working directory per game, for the bots' logs "
+                             "(default: %(default)s)")
+    args = parser.parse_args()
+
+    results = run_tournament(args.bots, args.games, seed=args.seed, sizes=args.sizes or [32], turns=args.turns,
+                             constants=load_constants(args.config), timeout=args.timeout, workers=args.workers,
+                             log_dir=args.logs)
+    if args.results:
+        with open(args.results, "w") as output:
+            json.dump(results, output)
+    print(json.dumps(summarize(args.bots, results), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,159 @@
 #!/usr/bin/env python3
 # Python 3.6
 
-import math
 import hlt
+import numpy as np
 from hlt import constants
-from hlt.positionals import Direction, Position
-import random
+from hlt.positionals import Direction
 import logging
-from hlt.entity import Ship
+from hlt.planner import MovePlanner
+from hlt.mining import MiningTargets
+from hlt.navigation import Navigator, ReturnPlanner
+from hlt.fsm import ShipStateMachine
+from hlt.dropoffs import DropoffPlanner
+from hlt.economy import Economy
+from hlt.recall import RecallScheduler
 
-# Define the maximum number of ships that can be spawned
-MAX_SHIPS = 5
+# Cells with no more halite than this are left for richer ones
+MIN_CELL_HALITE = 10
 
-global canSpawned
+# Build dropoffs only on maps at least this wide, and at most this many of them
+DROPOFF_MIN_MAP_SIZE = 48
+MAX_DROPOFFS = 1
+
+# Only give up a ship for a dropoff once there are this many
+DROPOFF_MIN_SHIPS = 10
+
+# The least halite around a site worth building a dropoff on
+DROPOFF_MIN_HALITE = 8000
+
+# Stop planning dropoffs this many turns before the end of the game
+DROPOFF_LAST_TURNS = 100
 
 """ <<<Game Begin>>> """
-canSpawned = False
-game = hlt.Game()
+game = hlt.Game(async_logging=True)
+# Dropoffs are only planned on large maps
+dropoffs = DropoffPlanner(game) if game.game_map.width >= DROPOFF_MIN_MAP_SIZE else None
+economy = Economy(game)
 game.ready("Decepticon")
 
 logging.info("Successfully created bot! My Player ID is {}.".format(game.my_id))
 
 """ <<<Game Loop>>> """
 
-stages = {'go_to_collect', 'collecting', 'back_home'}
-ship_stage = {}
-ship_canBack = {}  
+machine = ShipStateMachine('go_to_collect')
+
+
+def at_target(ship):
+    target = machine.memory(ship).get('target')
+    return target is not None and ship.position == target
+
+
+def is_full(ship):
+    return ship.halite_amount >= constants.MAX_HALITE
+
+
+def cell_exhausted(ship):
+    return game_map[ship.position].halite_amount <= MIN_CELL_HALITE
+
+
+def at_structure(ship):
+    return returns.distance(ship) == 0
+
+
+def site_taken(ship):
+    return game_map[machine.memory(ship)['site']].has_structure
+
 
+def must_return(ship):
+    return recall.should_recall(ship)
 
-def is_position_occupied(pos):
-    for other_ship in game.me.get_ships():
-        if other_ship.position == pos:
-            return True
-    return False
 
-def check_move_conflicts(command_queue):
-    move_targets = set()
-    new_command_queue = []
+def go_to_collect(ships):
+    targets = MiningTargets(game, min_halite=MIN_CELL_HALITE).assign(ships)
+    for ship in ships:
+        target = machine.memory(ship)['target'] = targets.get(ship.id)
+        if target is not None:
+            planner.request(ship, navigator.ranked_moves(ship, target))
+        elif ship.halite_amount > 0:
+            # Nothing left worth mining: bring home what it has
+            planner.request(ship, returns.ranked_moves(ship))
+        elif at_structure(ship):
+            planner.request(ship, Direction.get_all_cardinals())
+        else:
+            planner.request(ship, [Direction.Still])
 
-    for command in command_queue:
-        if isinstance(command, str) and command.startswith("MOVE"):
-            parts = command.split()
-            if len(parts) > 2:
-                target_pos = parts[2]
-                if target_pos in move_targets:
-                    continue
-                move_targets.add(target_pos)
-        new_command_queue.append(command)
 
-    return new_command_queue
+def collecting(ships):
+    for ship in ships:
+        planner.request(ship, [Direction.Still])
+
+
+def back_home(ships):
+    for ship in ships:
+        planner.request(ship, returns.ranked_moves(ship))
+
+
+def build_dropoff(ships):
+    for ship in ships:
+        site = machine.memory(ship)['site']
+        if ship.position == site and DropoffPlanner.cost(ship, game_map) <= me.halite_amount:
+            command_queue.append(ship.make_dropoff())
+            logging.info("Ship %s is building a dropoff at %s", ship.id, site)
+        else:
+            planner.request(ship, navigator.ranked_moves(ship, site))
+
+
+def plan_dropoff():
+    if dropoffs is None or len(me.get_dropoffs()) >= MAX_DROPOFFS \
+            or len(me.get_ships()) < DROPOFF_MIN_SHIPS or me.halite_amount < constants.DROPOFF_COST \
+            or game.turn_number > constants.MAX_TURNS - DROPOFF_LAST_TURNS:
+        return
+    site = dropoffs.best_site(me, min_halite=DROPOFF_MIN_HALITE)
+    candidates = machine.ships_in('go_to_collect', me.get_ships())
+    if site is None or not candidates:
+        return
+    builder = min(candidates, key=lambda ship: game_map.calculate_distance(ship.position, site))
+    machine.set_state(builder, 'build_dropoff')
+    machine.memory(builder)['site'] = site
+    logging.info("Ship %s is heading to build a dropoff at %s", builder.id, site)
+
+
+def recalled(ships):
+    if recall.is_last_turn:
+        # Ships colliding on a structure still deposit their cargo
+        for structure in [me.shipyard] + me.get_dropoffs():
+            planner.share(structure.position)
+    for ship in ships:
+        if ship.halite_amount > 0:
+            planner.request(ship, returns.ranked_moves(ship))
+        else:
+            # Make room for the ships coming home, stepping aside if one needs the cell
+            planner.request(ship, returns.away_moves(ship))
+
+
+def avoid_opponents():
+    # Keep off the cells opponent ships are on or can move to, except your structures, where
+    # a collision brings you their cargo
+    threatened = game.ships.threats(me.id, 1) > 0
+    for structure in [me.shipyard] + me.get_dropoffs():
+        threatened[structure.position.y, structure.position.x] = False
+    for index in np.flatnonzero(threatened).tolist():
+        planner.reserve(game_map.positions.positions[index])
+
+
+for stage in ('go_to_collect', 'collecting', 'back_home'):
+    machine.add_transition(stage, 'recalled', must_return)
+machine.add_transition('go_to_collect', 'collecting', at_target)
+machine.add_transition('collecting', 'back_home', is_full)
+machine.add_transition('collecting', 'go_to_collect', cell_exhausted)
+machine.add_transition('back_home', 'go_to_collect', at_structure)
+machine.add_transition('build_dropoff', 'go_to_collect', site_taken)
+machine.set_handler('go_to_collect', go_to_collect)
+machine.set_handler('collecting', collecting)
+machine.set_handler('back_home', back_home)
+machine.set_handler('build_dropoff', build_dropoff)
+machine.set_handler('recalled', recalled)
 
 while True:
     game.update_frame()
@@ -56,99 +161,28 @@ while True:
     game_map = game.game_map
 
     command_queue = []
-
-    for ship in me.get_ships():
-        if ship.id not in ship_stage:
-            ship_stage[ship.id] = 'go_to_collect'
-            ship_canBack[ship.id] = True  
-
-        if ship_stage[ship.id] == 'go_to_collect':
-            shipSpawnedAfterDrop()
-            halite_values = {}
-            direction_values = {}
-            for direction in [Direction.North, Direction.South, Direction.East, Direction.West]:
-                pos = ship.position.directional_offset(direction)
-                halite_values[pos] = game_map[pos].halite_amount
-                direction_values[pos] = direction
-
-            if len(halite_values) > 0:
-                highest_halite_pos = max(halite_values, key=halite_values.get)  
-                direction = direction_values[highest_halite_pos]  
-                
-                target_pos = ship.position.directional_offset(direction)
-                if is_position_occupied(target_pos):
-                    logging.info(f"Ship {ship.id} found collision at {target_pos}. Choosing another direction.")
-                    available_directions = [Direction.North, Direction.South, Direction.East, Direction.West]
-                    random.shuffle(available_directions) 
-                    for alt_direction in available_directions: 
-                        alt_target_pos = ship.position.directional_offset(alt_direction)
-                        if not is_position_occupied(alt_target_pos):
-                            direction = alt_direction
-                            break
-
-                command_queue.append(ship.move(direction))
-                ship_stage[ship.id] = 'collecting'
-                logging.info(f"Ship {ship.id} moved to collect halite and is now in 'collecting' state")
-            
-            else:
-                command_queue.append(ship.stay_still())
-
-        elif ship_stage[ship.id] == 'collecting':
-            command_queue.append(ship.stay_still()) 
-
-            if ship.halite_amount >= constants.MAX_HALITE and ship_canBack[ship.id] == True:
-                ship_stage[ship.id] = 'back_home'
-                ship_canBack[ship.id] = False  
-                logging.info(f"Ship {ship.id} changed to back_home state")
-            
-            elif game_map[ship.position].halite_amount <= 10:
-                ship_stage[ship.id] = 'go_to_collect'
-                logging.info(f"Ship {ship.id} changed to go_to_collect state")
-
-        elif ship_stage[ship.id] == 'back_home':
-            d = Position(0, 0)
-            d.x = me.shipyard.position.x - ship.position.x
-            d.y = me.shipyard.position.y - ship.position.y
-
-            cmd = Direction.Still
-            if d.x > 0:
-                cmd = Direction.East
-            elif d.x < 0:
-                cmd = Direction.West
-            if d.y > 0:
-                cmd = Direction.South
-            elif d.y < 0:
-                cmd = Direction.North
-
-            target_pos = ship.position.directional_offset(cmd)
-            if is_position_occupied(target_pos):
-                available_directions = [Direction.North, Direction.South, Direction.East, Direction.West]
-                random.shuffle(available_directions)  
-                for alt_direction in available_directions:
-                    alt_target_pos = ship.position.directional_offset(alt_direction)
-                    if not is_position_occupied(alt_target_pos):
-                        cmd = alt_direction
-                        break
-
-            command_queue.append(ship.move(cmd))
-
-            if ship.position == me.shipyard.position:
-                canSpawned = True
-                ship_canBack[ship.id] = True 
-                ship_stage[ship.id] = 'go_to_collect'
-                logging.info(f"Ship {ship.id} reached the shipyard and changed to go_to_collect state")
-
-    if game.turn_number <= 1 and me.halite_amount >= constants.SHIP_COST and not game_map[me.shipyard].is_occupied:
-        if len(me.get_ships()) < MAX_SHIPS:
-            command_queue.append(me.shipyard.spawn())
-
-    def shipSpawnedAfterDrop():
-        global canSpawned
-        if game.turn_number >= 2 and me.halite_amount >= constants.SHIP_COST and canSpawned == True and not game_map[me.shipyard].is_occupied:
-            if len(me.get_ships()) < MAX_SHIPS:
-                command_queue.append(me.shipyard.spawn())
-                canSpawned = False
-
-    command_queue = check_move_conflicts(command_queue)
-
-    game.end_turn(command_queue)
+    planner = MovePlanner(game_map)
+    navigator = Navigator(game_map, time_budget=1.0)
+    returns = ReturnPlanner(game_map, me)
+    recall = RecallScheduler(game, returns)
+    if dropoffs is not None:
+        dropoffs.update(game.delta.changed_cells)
+    economy.update(game.delta.changed_cells)
+
+    building = machine.ships_in('build_dropoff', me.get_ships())
+    if not building:
+        plan_dropoff()
+
+    machine.run(me)
+    avoid_opponents()
+
+    # Save up for a planned dropoff rather than spawn
+    reserve = constants.DROPOFF_COST if building else 0
+    if me.halite_amount >= constants.SHIP_COST + reserve and not game.ships.is_occupied(me.shipyard.position) \
+            and economy.should_spawn():
+        command_queue.append(me.shipyard.spawn())
+        planner.reserve(me.shipyard.position)
+
+    command_queue.extend(planner.resolve())
+
+    game.finish_turn(command_queue)
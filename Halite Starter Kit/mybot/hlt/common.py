@@ -1,11 +1,106 @@
+import logging
+import sys
+import threading
+
+import numpy as np
+
+# Per-thread state: replacements for stdin and stdout (see use_streams) and the
+# callbacks to run once the engine closed the input stream (see at_end_of_input)
+_local = threading.local()
+
+
+def use_streams(input_stream, output_stream):
+    """
+    Talk to the engine through other binary streams than stdin and stdout, e.g. to run
+    a bot inside the same process as the engine. Only affects the calling thread.
+    :param input_stream: An object with a readline() returning bytes, or None for stdin
+    :param output_stream: An object with write(bytes) and flush(), or None for stdout
+    :return: The (input_stream, output_stream) pair used before, to restore them later
+    """
+    previous = getattr(_local, 'input', None), getattr(_local, 'output', None)
+    _local.input = input_stream
+    _local.output = output_stream
+    return previous
+
+
+def isolate_logging(isolate=True):
+    """
+    Declare that the calling thread runs one of several bots sharing a process: its Game
+    then logs only the records of this thread, to its own file, and leaves logging alone
+    for the others. Only affects the calling thread.
+    :param isolate: Whether to isolate the logging of this thread
+    """
+    _local.isolate_logging = isolate
+
+
+def logging_isolated():
+    """
+    :return: Whether the calling thread's logging is isolated, see isolate_logging
+    """
+    return getattr(_local, 'isolate_logging', False)
+
+
+def input_stream():
+    """
+    :return: The binary stream engine input is read from
+    """
+    return getattr(_local, 'input', None) or sys.stdin.buffer
+
+
+def output_stream():
+    """
+    :return: The binary stream commands are written to
+    """
+    return getattr(_local, 'output', None) or sys.stdout.buffer
+
+
 # Placed here to avoid circular imports
 def read_input():
     """
     Reads input from stdin, shutting down logging and exiting if an EOFError occurs
     :return: input read
     """
-    try:
-        return input()
-    except EOFError as eof:
+    line = input_stream().readline()
+    if not line:
+        _end_of_input()
+    return line.decode().rstrip('\r\n')
+
+
+def read_values(lines):
+    """
+    Reads several lines from stdin in one go and parses all of their integers,
+    shutting down logging and exiting if an EOFError occurs
+    :param lines: The number of lines to read
+    :return: A NumPy array of all integers read, in order
+    """
+    readline = input_stream().readline
+    chunks = [readline() for _ in range(lines)]
+    if lines and not chunks[-1]:
+        _end_of_input()
+    return np.fromstring(b"".join(chunks), dtype=np.int64, sep=' ')
+
+
+def at_end_of_input(callback):
+    """
+    Register a function to call when the game is over, i.e. once the engine closed the
+    input stream. Callbacks run before logging is shut down. Only affects the calling thread.
+    :param callback: A function taking no arguments
+    """
+    if not hasattr(_local, 'end_callbacks'):
+        _local.end_callbacks = []
+    _local.end_callbacks.append(callback)
+
+
+def _end_of_input():
+    """
+    Runs the end of input callbacks, shuts down logging and exits once the engine closed the input stream.
+    Logging is left running when it is isolated, since other bots of the process still use it.
+    """
+    for callback in getattr(_local, 'end_callbacks', ()):
+        try:
+            callback()
+        except Exception:
+            logging.exception("End of input callback failed")
+    if not logging_isolated():
         logging.shutdown()
-        raise SystemExit(eof)
+    raise SystemExit(EOFError("EOF when reading a line"))
@@ -0,0 +1,102 @@
+import functools
+
+import numpy as np
+
+
+class DistanceTable:
+    """
+    Wrapped Manhattan distance fields for one map size.
+
+    A distance field is an array indexed [y, x] holding the distance of every cell
+    to a source. Fields are cached per source (and per set of sources), so they are
+    computed once per map size and shared across turns. Cached fields are read-only.
+    Use DistanceTable.get to share one table per map size.
+    """
+    _tables = {}
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self._dx = self._wrapped_offsets(width)
+        self._dy = self._wrapped_offsets(height)
+
+    @staticmethod
+    def _wrapped_offsets(size):
+        """
+        :return: A (size, size) array of the wrapped distance between two coordinates
+        """
+        coordinates = np.arange(size)
+        offsets = np.abs(coordinates[:, None] - coordinates[None, :])
+        return np.minimum(offsets, size - offsets).astype(np.int16)
+
+    @staticmethod
+    def get(width, height):
+        """
+        Returns the shared table for a map size, creating it on first use.
+        :param width: The map width
+        :param height: The map height
+        :return: The DistanceTable
+        """
+        table = DistanceTable._tables.get((width, height))
+        if table is None:
+            table = DistanceTable._tables[(width, height)] = DistanceTable(width, height)
+        return table
+
+    def index(self, position):
+        """
+        :return: The row-major index of a position, accounting for wrap-around
+        """
+        return (position.y % self.height) * self.width + position.x % self.width
+
+    @functools.lru_cache(maxsize=1024)
+    def field(self, index):
+        """
+        :param index: The row-major index of the source cell
+        :return: The distance from the source to every cell
+        """
+        y, x = divmod(index, self.width)
+        field = self._dy[y][:, None] + self._dx[x][None, :]
+        field.setflags(write=False)
+        return field
+
+    @functools.lru_cache(maxsize=256)
+    def multi_field(self, indices):
+        """
+        :param indices: A tuple of row-major source indices
+        :return: The distance from every cell to its closest source
+        """
+        field = np.minimum.reduce([self.field(index) for index in indices])
+        field.setflags(write=False)
+        return field
+
+    @functools.lru_cache(maxsize=64)
+    def nearest(self, indices):
+        """
+        :param indices: A tuple of row-major source indices
+        :return: The distance to the closest source and, for every cell, the position
+                 of that source within indices
+        """
+        fields = np.stack([self.field(index) for index in indices])
+        closest = fields.argmin(axis=0)
+        distances = np.take_along_axis(fields, closest[None], axis=0)[0]
+        distances.setflags(write=False)
+        closest.setflags(write=False)
+        return distances, closest
+
+    @functools.lru_cache(maxsize=16)
+    def _diamond_kernel(self, radius):
+        """
+        :return: The real FFT of the cells within radius of the origin
+        """
+        return np.fft.rfft2(self.field(0) <= radius)
+
+    def diamond_sum(self, grid, radius):
+        """
+        Sum a grid over the Manhattan diamond around every cell. Accounts for wrap-around.
+        Computed as a circular convolution in the frequency domain.
+        :param grid: An integer array indexed [y, x]
+        :param radius: The Manhattan radius of the diamond
+        :return: An int64 array with, for every cell, the sum of grid within radius of it
+        """
+        spectrum = np.fft.rfft2(grid) * self._diamond_kernel(radius)
+        return np.rint(np.fft.irfft2(spectrum, s=grid.shape)).astype(np.int64)
@@ -0,0 +1,79 @@
+import numpy as np
+
+from . import constants
+from .regions import HaliteSums
+
+
+class DropoffPlanner:
+    """
+    Finds where a new dropoff would save the most travel.
+
+    Reads, for every cell, the halite within radius of it (the halite ships could mine
+    around a dropoff there) from HaliteSums. Create it once per game and pass it every
+    frame's changed cells, so the sums follow the depleting halite. A site is scored by
+    that halite times the turns a trip from there saves, i.e. its distance to the closest
+    existing structure. Sites too far away are left out: ships would spend as long
+    getting there as they save.
+    """
+    def __init__(self, game, radius=5, min_distance=8, max_distance=16):
+        """
+        :param game: The Game
+        :param radius: The Manhattan radius of the area a dropoff serves, at most (size - 1) // 2
+        :param min_distance: The smallest distance between a site and the player's structures
+        :param max_distance: The largest distance between a site and the player's structures
+        """
+        self.game = game
+        self.game_map = game.game_map
+        self.radius = radius
+        self.min_distance = min_distance
+        self.max_distance = max_distance
+        self.sums = HaliteSums(self.game_map, max_radius=radius)
+
+    def update(self, changed_cells):
+        """
+        Apply the halite changes of a frame.
+        :param changed_cells: The rows (x, y, previous halite, halite) of Game.delta.changed_cells
+        """
+        self.sums.update(changed_cells)
+
+    @property
+    def density(self):
+        """
+        :return: An int64 array indexed [y, x] of the halite within radius of every cell
+        """
+        return self.sums.diamond_sums(self.radius)
+
+    def scores(self, player):
+        """
+        :param player: The player building the dropoff
+        :return: A float array indexed [y, x] of the halite around every cell times the turns
+                 a trip from there saves, -inf where a dropoff cannot or should not be built
+        """
+        home_distances, _ = self.game_map.nearest_structure_map(player)
+        scores = self.density * home_distances.astype(np.float64)
+        scores[(home_distances < self.min_distance) | (home_distances > self.max_distance)] = -np.inf
+        for other in self.game.players.values():
+            for structure in [other.shipyard] + other.get_dropoffs():
+                scores[structure.position.y, structure.position.x] = -np.inf
+        return scores
+
+    def best_site(self, player, min_halite=0):
+        """
+        :param player: The player building the dropoff
+        :param min_halite: The least halite within radius of a site worth building on
+        :return: The position of the best site, or None if no cell qualifies
+        """
+        scores = self.scores(player)
+        scores[self.density < min_halite] = -np.inf
+        index = int(scores.argmax())
+        if scores.flat[index] == -np.inf:
+            return None
+        return self.game_map.positions.positions[index]
+
+    @staticmethod
+    def cost(ship, game_map):
+        """
+        :param ship: The ship to turn into a dropoff where it stands
+        :return: The halite the player has to pay, after the ship's cargo and the cell's halite
+        """
+        return max(0, constants.DROPOFF_COST - ship.halite_amount - game_map[ship.position].halite_amount)
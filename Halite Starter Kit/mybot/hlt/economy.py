@@ -0,0 +1,103 @@
+import numpy as np
+
+from . import constants
+
+
+class Economy:
+    """
+    Estimates what one more ship would bring home before the game ends.
+
+    Create it once per game and call update every frame with Game.delta.changed_cells: the
+    totals below follow the halite changes instead of being recomputed from the map. A ship
+    makes round trips of twice the halite-weighted distance to your closest structure plus
+    the turns needed to fill up on the cells ships go for (weighted by their halite), and
+    brings MAX_HALITE home per trip. It cannot get more than its share of what is left:
+    harvest_fraction of the map's halite split between all ships in the game, so the fleet
+    size follows the map size and the number of players.
+    """
+    def __init__(self, game, harvest_fraction=0.7):
+        """
+        :param game: The Game
+        :param harvest_fraction: The part of the map's halite the ships can be expected to gather
+        """
+        self.game = game
+        self.harvest_fraction = harvest_fraction
+        halite = game.game_map.halite_grid().astype(np.int64)
+        self.total_halite = int(halite.sum())
+        self._squared_halite = int((halite ** 2).sum())
+        self._structures = None
+        self._distances = None
+        self._weighted_distance = 0
+
+    def update(self, changed_cells):
+        """
+        Apply the halite changes of a frame.
+        :param changed_cells: The rows (x, y, previous halite, halite) of Game.delta.changed_cells
+        """
+        # A refresh reads the weighted distance from the map, which already holds this frame
+        refreshed = self._refresh_structures()
+        if changed_cells is None or not len(changed_cells):
+            return
+        previous = changed_cells[:, 2]
+        current = changed_cells[:, 3]
+        self.total_halite += int((current - previous).sum())
+        self._squared_halite += int((current ** 2 - previous ** 2).sum())
+        if refreshed:
+            return
+        distances = self._distances[changed_cells[:, 1], changed_cells[:, 0]].astype(np.int64)
+        self._weighted_distance += int(((current - previous) * distances).sum())
+
+    def _refresh_structures(self):
+        """
+        Recompute the distance totals when you get a new structure.
+        :return: Whether they were recomputed
+        """
+        me = self.game.me
+        structures = [me.shipyard] + me.get_dropoffs()
+        if self._structures is not None and len(structures) == len(self._structures):
+            return False
+        self._structures = structures
+        self._distances, _ = self.game.game_map.nearest_structure_map(me)
+        halite = self.game.game_map.halite_grid().astype(np.int64)
+        self._weighted_distance = int((halite * self._distances).sum())
+        return True
+
+    @property
+    def haul_distance(self):
+        """
+        :return: The halite-weighted average distance from the map to your closest structure
+        """
+        self._refresh_structures()
+        return self._weighted_distance / max(self.total_halite, 1)
+
+    @property
+    def mining_turns(self):
+        """
+        :return: The turns needed to fill a ship on cells holding the halite-weighted average halite
+        """
+        rich_halite = self._squared_halite / max(self.total_halite, 1)
+        return constants.MAX_HALITE * constants.EXTRACT_RATIO / max(rich_halite, 1)
+
+    @property
+    def trip_turns(self):
+        """
+        :return: The length of a round trip from your structures to a full cargo and back
+        """
+        return 2 * self.haul_distance + self.mining_turns
+
+    def ship_value(self):
+        """
+        :return: The halite one more ship spawned this turn is expected to bring home
+        """
+        remaining_turns = constants.MAX_TURNS - self.game.turn_number - 1
+        trips = max(0, remaining_turns) // max(1, int(np.ceil(self.trip_turns)))
+        ships = len(self.game.ships) + 1
+        share = self.harvest_fraction * self.total_halite / ships
+        return min(trips * constants.MAX_HALITE, share)
+
+    def should_spawn(self, margin=1.0):
+        """
+        :param margin: How many times its cost a ship has to bring back
+        :return: Whether one more ship is expected to pay for itself
+        """
+        return self.ship_value() > margin * constants.SHIP_COST
@@ -1,7 +1,7 @@
 import abc
 
 from . import commands, constants
-from .positionals import Direction, Position
+from .positionals import _DIRECTION_CODES, Direction, PositionTable
 from .common import read_input
 
 
@@ -9,6 +9,8 @@ class Entity(abc.ABC):
     """
     Base Entity Class from whence Ships, Dropoffs and Shipyards inherit
     """
+    __slots__ = ('owner', 'id', 'position')
+
     def __init__(self, owner, id, position):
         self.owner = owner
         self.id = id
@@ -22,7 +24,19 @@ class Entity(abc.ABC):
         :return: An instance of Entity along with its id
         """
         ship_id, x_position, y_position = map(int, read_input().split())
-        return ship_id, Entity(player_id, ship_id, Position(x_position, y_position))
+        position = PositionTable.get(constants.WIDTH, constants.HEIGHT).at(x_position, y_position)
+        return ship_id, Entity(player_id, ship_id, position)
+
+    @classmethod
+    def _create(cls, player_id, entity_id, position):
+        """
+        Creates an entity of this class from already parsed engine input.
+        :param player_id: The player id for the player who owns this entity
+        :param entity_id: The entity id
+        :param position: The entity position
+        :return: The entity
+        """
+        return cls(player_id, entity_id, position)
 
     def __repr__(self):
         return "{}(id={}, {})".format(self.__class__.__name__,
@@ -40,27 +54,36 @@ class Dropoff(Entity):
     """
     Dropoff class for housing dropoffs
     """
-    pass
+    __slots__ = ()
 
 
 class Shipyard(Entity):
     """
     Shipyard class to house shipyards
     """
+    __slots__ = ()
+
     def spawn(self):
         """Return a move to spawn a new ship."""
         return commands.GENERATE
 
 
+# The command character of every direction, keyed by Direction tuple and by the character itself
+_MOVE_CODES = dict(_DIRECTION_CODES)
+_MOVE_CODES.update((code, code) for code in _DIRECTION_CODES.values())
+
+
 class Ship(Entity):
     """
     Ship class to house ship entities
     """
-    __ships = {}
+    __slots__ = ('halite_amount', '_move_prefix')
 
     def __init__(self, owner, id, position, halite_amount):
         super().__init__(owner, id, position)
         self.halite_amount = halite_amount
+        # The start of this ship's move commands, built on first use
+        self._move_prefix = None
 
     @property
     def is_full(self):
@@ -76,43 +99,100 @@ class Ship(Entity):
         Return a move to move this ship in a direction without
         checking for collisions.
         """
-        raw_direction = direction
-        if not isinstance(direction, str) or direction not in "nsewo":
-            raw_direction = Direction.convert(direction)
-        return "{} {} {}".format(commands.MOVE, self.id, raw_direction)
+        code = _MOVE_CODES.get(direction)
+        if code is None:
+            # Raises for anything which is not a direction
+            return "{} {} {}".format(commands.MOVE, self.id, Direction.convert(direction))
+        prefix = self._move_prefix
+        if prefix is None:
+            prefix = self._move_prefix = "{} {} ".format(commands.MOVE, self.id)
+        return prefix + code
 
     def stay_still(self):
         """
         Don't move this ship.
         """
-        return "{} {} {}".format(commands.MOVE, self.id, commands.STAY_STILL)
+        return self.move(commands.STAY_STILL)
 
     @staticmethod
-    def _generate(player_id):
+    def _generate(player_id, registry=None):
         """
         Creates an instance of a ship for a given player given the engine's input.
-        If an instance with the same ship.id has previously been generated, that instance will be returned.
+        If the registry already holds this ship, that instance will be returned.
         :param player_id: The id of the player who owns this ship
+        :param registry: The ShipRegistry of the game, or None to always create a new instance
         :return: The ship id and ship object
         """
         # Read game engine input
         ship_id, x_position, y_position, halite = map(int, read_input().split())
+        position = PositionTable.get(constants.WIDTH, constants.HEIGHT).at(x_position, y_position)
+        if registry is None:
+            return ship_id, Ship._create(player_id, ship_id, position, halite)
+        return ship_id, registry.create(player_id, ship_id, position, halite)
 
-        # Check storage to see if ship already exists
-        # If the ship exists, update its position and halite
-        if ship_id in Ship.__ships.keys():    
-            old_ship = Ship.__ships[ship_id]
-            old_ship.position = Position(x_position, y_position)
-            old_ship.halite_amount = halite
-            return ship_id, old_ship
-        else:
-            # Otherwise, create and return a new instance
-            new_ship = Ship(player_id, ship_id, Position(x_position, y_position), halite)
-            Ship.__ships[ship_id] = new_ship
-            return ship_id, new_ship
+    @classmethod
+    def _create(cls, player_id, ship_id, position, halite):
+        """
+        Creates an instance of a ship from already parsed engine input.
+        :param player_id: The id of the player who owns this ship
+        :param ship_id: The ship id
+        :param position: The ship position
+        :param halite: The halite the ship carries
+        :return: The ship object
+        """
+        return cls(player_id, ship_id, position, halite)
 
     def __repr__(self):
         return "{}(id={}, {}, cargo={} halite)".format(self.__class__.__name__,
                                                        self.id,
                                                        self.position,
                                                        self.halite_amount)
+
+
+class ShipRegistry:
+    """
+    The live ships of one game, keyed by (owner, ship id).
+
+    Each Game has its own registry, so nothing is shared between games. Ships are
+    evicted when they are destroyed, so the registry only ever holds the ships on the map.
+    """
+    def __init__(self):
+        self._ships = {}
+
+    def __len__(self):
+        return len(self._ships)
+
+    def __contains__(self, key):
+        return key in self._ships
+
+    def get(self, owner, ship_id):
+        """
+        :param owner: The id of the player who owns the ship
+        :param ship_id: The ship id
+        :return: The ship, or None if it is not alive
+        """
+        return self._ships.get((owner, ship_id))
+
+    def create(self, owner, ship_id, position, halite):
+        """
+        Returns the live ship with this key updated to the given state, creating it if needed.
+        :param owner: The id of the player who owns the ship
+        :param ship_id: The ship id
+        :param position: The ship position
+        :param halite: The halite the ship carries
+        :return: The ship object
+        """
+        ship = self._ships.get((owner, ship_id))
+        if ship is None:
+            ship = self._ships[(owner, ship_id)] = Ship._create(owner, ship_id, position, halite)
+        else:
+            ship.position = position
+            ship.halite_amount = halite
+        return ship
+
+    def evict(self, ship):
+        """
+        Forget a destroyed ship.
+        :param ship: The ship
+        """
+        self._ships.pop((ship.owner, ship.id), None)
@@ -0,0 +1,101 @@
+import logging
+
+
+class ShipStateMachine:
+    """
+    Keeps one state per ship of a player and runs the ships of each state together.
+
+    Transitions are a table of (source, target, condition, action) rows, checked in the
+    order they were added: once per turn, each ship takes the first transition out of its
+    state whose condition holds. Then the handler of every state is called once with all
+    ships in that state, so work such as target assignment can be done for the whole batch.
+    New ships start in the initial state, and ships the player no longer has are forgotten,
+    along with their memory.
+    """
+    def __init__(self, initial):
+        """
+        :param initial: The state of new ships
+        """
+        self.initial = initial
+        self._transitions = {}
+        self._handlers = {}
+        self._states = {}
+        self._memory = {}
+
+    def add_transition(self, source, target, condition, action=None):
+        """
+        :param source: The state the transition leaves
+        :param target: The state the transition enters
+        :param condition: A function of a ship returning whether to take the transition
+        :param action: If given, a function of a ship to call when taking the transition
+        """
+        self._transitions.setdefault(source, []).append((target, condition, action))
+
+    def set_handler(self, state, handler):
+        """
+        :param state: The state to handle
+        :param handler: A function taking the list of ships in that state, called once per turn
+        """
+        self._handlers[state] = handler
+
+    def state_of(self, ship):
+        """
+        :param ship: A ship of the player
+        :return: Its state, or None if the ship was never seen
+        """
+        return self._states.get(ship.id)
+
+    def set_state(self, ship, state):
+        """
+        Put a ship in a state directly, bypassing the transition table.
+        """
+        self._states[ship.id] = state
+
+    def memory(self, ship):
+        """
+        :param ship: A ship of the player
+        :return: A dict for any data to keep about the ship, dropped along with the ship
+        """
+        return self._memory.setdefault(ship.id, {})
+
+    def ships_in(self, state, ships):
+        """
+        :param state: A state
+        :param ships: The ships to look among
+        :return: The list of those ships in that state
+        """
+        return [ship for ship in ships if self._states.get(ship.id) == state]
+
+    def _forget_lost(self, player):
+        """
+        Drop the states and memory of the ships the player no longer has.
+        """
+        lost = [ship_id for ship_id in self._states if not player.has_ship(ship_id)]
+        for ship_id in lost:
+            del self._states[ship_id]
+            self._memory.pop(ship_id, None)
+
+    def run(self, player):
+        """
+        Play one turn: forget lost ships, apply the transitions, then run the handlers.
+        Handlers run in the order they were set.
+        :param player: The player whose ships to run
+        """
+        self._forget_lost(player)
+
+        batches = {}
+        for ship in player.get_ships():
+            state = self._states.setdefault(ship.id, self.initial)
+            for target, condition, action in self._transitions.get(state, ()):
+                if condition(ship):
+                    logging.info("Ship %s changed from %s to %s", ship.id, state, target)
+                    if action is not None:
+                        action(ship)
+                    state = self._states[ship.id] = target
+                    break
+            batches.setdefault(state, []).append(ship)
+
+        for state, handler in self._handlers.items():
+            ships = batches.get(state)
+            if ships:
+                handler(ships)
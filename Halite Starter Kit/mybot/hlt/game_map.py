@@ -1,14 +1,16 @@
-import queue
+import numpy as np
 
-from . import constants
-from .entity import Entity, Shipyard, Ship, Dropoff
-from .player import Player
-from .positionals import Direction, Position
-from .common import read_input
+from .distances import DistanceTable
+from .entity import Entity
+from .positionals import Direction, Position, PositionTable
+from .common import read_input, read_values
 
 
 class MapCell:
     """A cell on the game map."""
+    # Set by the owning GameMap to the list of cells marked unsafe this turn
+    _marked = None
+
     def __init__(self, position, halite_amount):
         self.position = position
         self.halite_amount = halite_amount
@@ -50,6 +52,8 @@ class MapCell:
         Use in conjunction with GameMap.naive_navigate.
         """
         self.ship = ship
+        if self._marked is not None:
+            self._marked.append(self)
 
     def __eq__(self, other):
         return self.position == other.position
@@ -61,6 +65,45 @@ class MapCell:
         return 'MapCell({}, halite={})'.format(self.position, self.halite_amount)
 
 
+class ArrayMapCell(MapCell):
+    """
+    A view onto a single cell of an ArrayGameMap.
+
+    Behaves like a MapCell, but reads and writes go straight to the map's arrays.
+    """
+    def __init__(self, game_map, position):
+        self._map = game_map
+        self._x = position.x
+        self._y = position.y
+        self.position = position
+
+    @property
+    def halite_amount(self):
+        return int(self._map.halite[self._y, self._x])
+
+    @halite_amount.setter
+    def halite_amount(self, value):
+        self._map.halite[self._y, self._x] = value
+
+    @property
+    def ship(self):
+        return self._map.ships[self._y, self._x]
+
+    @ship.setter
+    def ship(self, ship):
+        self._map.ships[self._y, self._x] = ship
+        self._map.ship_owners[self._y, self._x] = -1 if ship is None else ship.owner
+
+    @property
+    def structure(self):
+        return self._map.structures[self._y, self._x]
+
+    @structure.setter
+    def structure(self, structure):
+        self._map.structures[self._y, self._x] = structure
+        self._map.structure_owners[self._y, self._x] = -1 if structure is None else structure.owner
+
+
 class GameMap:
     """
     The game map.
@@ -71,7 +114,13 @@ class GameMap:
     def __init__(self, cells, width, height):
         self.width = width
         self.height = height
+        self.positions = PositionTable.get(width, height)
+        self.distances = DistanceTable.get(width, height)
         self._cells = cells
+        self._flat_cells = [cell for row in cells for cell in row]
+        self._marked_cells = []
+        for cell in self._flat_cells:
+            cell._marked = self._marked_cells
 
     def __getitem__(self, location):
         """
@@ -79,11 +128,10 @@ class GameMap:
         :param location: the position or entity to access in this map
         :return: the contents housing that cell or entity
         """
+        if isinstance(location, Entity):
+            location = location.position
         if isinstance(location, Position):
-            location = self.normalize(location)
-            return self._cells[location.y][location.x]
-        elif isinstance(location, Entity):
-            return self._cells[location.position.y][location.position.x]
+            return self._flat_cells[self.positions.index(location)]
         return None
 
     def calculate_distance(self, source, target):
@@ -94,11 +142,51 @@ class GameMap:
         :param target: The target to where calculate
         :return: The distance between these items
         """
-        source = self.normalize(source)
-        target = self.normalize(target)
-        resulting_position = abs(source - target)
-        return min(resulting_position.x, self.width - resulting_position.x) + \
-            min(resulting_position.y, self.height - resulting_position.y)
+        dx = abs(source.x % self.width - target.x % self.width)
+        dy = abs(source.y % self.height - target.y % self.height)
+        return min(dx, self.width - dx) + min(dy, self.height - dy)
+
+    def distance_field(self, sources):
+        """
+        Compute the Manhattan distance from one or more locations to every cell.
+        Accounts for wrap-around. Results are cached and shared across turns, so the
+        returned array is read-only.
+        :param sources: A position or entity, or an iterable of them
+        :return: An array indexed [y, x] with the distance to the closest source
+        """
+        if isinstance(sources, (Position, Entity)):
+            sources = (sources,)
+        indices = tuple(sorted({self.positions.index(self._position_of(source)) for source in sources}))
+        if len(indices) == 1:
+            return self.distances.field(indices[0])
+        return self.distances.multi_field(indices)
+
+    def nearest_structure_map(self, player):
+        """
+        Find, for every cell, the closest of a player's shipyard and dropoffs.
+        Accounts for wrap-around.
+        :param player: The player whose structures to consider
+        :return: A tuple of an array with the distance to the closest structure and an
+                 object array with that structure, both indexed [y, x]
+        """
+        structures = [player.shipyard] + player.get_dropoffs()
+        indices = tuple(self.positions.index(structure.position) for structure in structures)
+        distances, closest = self.distances.nearest(indices)
+        return distances, np.array(structures, dtype=object)[closest]
+
+    def halite_grid(self):
+        """
+        :return: The halite of every cell as an array indexed [y, x]
+        """
+        return np.array([cell.halite_amount for cell in self._flat_cells],
+                        dtype=np.int64).reshape(self.height, self.width)
+
+    @staticmethod
+    def _position_of(location):
+        """
+        :return: The position of a location given as a position or an entity
+        """
+        return location.position if isinstance(location, Entity) else location
 
     def normalize(self, position):
         """
@@ -107,9 +195,9 @@ class GameMap:
         height bounds, and places it within those bounds considering
         wraparound.
         :param position: A position object.
-        :return: A normalized position object fitting within the bounds of the map
+        :return: The interned (immutable) position fitting within the bounds of the map
         """
-        return Position(position.x % self.width, position.y % self.height)
+        return self.positions.at(position.x, position.y)
 
     @staticmethod
     def _get_target_direction(source, target):
@@ -171,26 +259,139 @@ class GameMap:
         :return: The map object
         """
         map_width, map_height = map(int, read_input().split())
+        positions = PositionTable.get(map_width, map_height)
         game_map = [[None for _ in range(map_width)] for _ in range(map_height)]
         for y_position in range(map_height):
             cells = read_input().split()
             for x_position in range(map_width):
-                game_map[y_position][x_position] = MapCell(Position(x_position, y_position,
-                                                                    normalize=False),
+                game_map[y_position][x_position] = MapCell(positions.at(x_position, y_position),
                                                            int(cells[x_position]))
         return GameMap(game_map, map_width, map_height)
 
+    def _clear_marks(self):
+        """
+        Mark the cells marked unsafe since the last update as safe again
+        """
+        for cell in self._marked_cells:
+            cell.ship = None
+        self._marked_cells.clear()
+
+    def _mark_ships(self, ships):
+        """
+        Mark the cells with ships as unsafe for navigation
+        :param ships: The ShipIndex of this frame
+        """
+        cells = self._flat_cells
+        for index, ship in zip(ships.indices.tolist(), ships.ships):
+            cells[index].mark_unsafe(ship)
+
     def _update(self):
         """
         Updates this map object from the input given by the game engine
-        :return: nothing
+        :return: An array with a row (x, y, previous halite, halite) for every changed cell
         """
         # Mark cells as safe for navigation (will re-mark unsafe cells
         # later)
-        for y in range(self.height):
-            for x in range(self.width):
-                self[Position(x, y)].ship = None
+        self._clear_marks()
+
+        # Cell update lines are "x y halite"; read all of them at once
+        updates = read_values(int(read_input())).reshape(-1, 3)
+        changes = np.empty((len(updates), 4), dtype=np.int64)
+        for row, (cell_x, cell_y, cell_energy) in enumerate(updates.tolist()):
+            cell = self._cells[cell_y][cell_x]
+            changes[row] = cell_x, cell_y, cell.halite_amount, cell_energy
+            cell.halite_amount = cell_energy
+        return changes
+
+
+class ArrayGameMap(GameMap):
+    """
+    A game map whose state lives in NumPy arrays indexed [y, x].
+
+    halite holds the halite of every cell, ships/structures hold the occupying
+    entity (or None) and ship_owners/structure_owners hold the owner's player id
+    (or -1). Indexing still returns MapCell-compatible views, so code written
+    against GameMap keeps working.
+    """
+    def __init__(self, halite, width, height):
+        self.halite = halite
+        self.ships = np.full((height, width), None, dtype=object)
+        self.ship_owners = np.full((height, width), -1, dtype=np.int16)
+        self.structures = np.full((height, width), None, dtype=object)
+        self.structure_owners = np.full((height, width), -1, dtype=np.int16)
+        positions = PositionTable.get(width, height)
+        cells = [[ArrayMapCell(self, positions.at(x, y)) for x in range(width)]
+                 for y in range(height)]
+        super().__init__(cells, width, height)
+
+    @property
+    def total_halite(self):
+        """
+        :return: The amount of halite left on the whole map
+        """
+        return int(self.halite.sum())
+
+    def occupied_mask(self, owner=None):
+        """
+        :param owner: If given, only consider ships of this player id
+        :return: A boolean array which is True where a ship is
+        """
+        if owner is None:
+            return self.ship_owners >= 0
+        return self.ship_owners == owner
+
+    def halite_around(self, radius):
+        """
+        Sum the halite within a Manhattan distance of every cell. Accounts for wrap-around.
+        :param radius: The Manhattan radius to sum over
+        :return: An array with, for every cell, the halite within radius of it
+        """
+        return self.distances.diamond_sum(self.halite, radius)
+
+    def halite_grid(self):
+        """
+        :return: The halite of every cell as an array indexed [y, x]. This is the map's own array.
+        """
+        return self.halite
+
+    def _clear_marks(self):
+        """
+        Mark every cell as safe again
+        """
+        self.ships.fill(None)
+        self.ship_owners.fill(-1)
+        self._marked_cells.clear()
+
+    def _mark_ships(self, ships):
+        """
+        Mark the cells with ships as unsafe for navigation
+        :param ships: The ShipIndex of this frame
+        """
+        occupants = np.empty(len(ships), dtype=object)
+        occupants[:] = ships.ships
+        self.ships.reshape(-1)[ships.indices] = occupants
+        self.ship_owners.reshape(-1)[ships.indices] = ships.owners
+
+    @staticmethod
+    def _generate():
+        """
+        Creates an array map object from the input given by the game engine
+        :return: The map object
+        """
+        map_width, map_height = map(int, read_input().split())
+        halite = read_values(map_height).astype(np.int32)
+        return ArrayGameMap(halite.reshape(map_height, map_width), map_width, map_height)
+
+    def _update(self):
+        """
+        Updates this map object from the input given by the game engine
+        :return: An array with a row (x, y, previous halite, halite) for every changed cell
+        """
+        self._clear_marks()
 
-        for _ in range(int(read_input())):
-            cell_x, cell_y, cell_energy = map(int, read_input().split())
-            self[Position(cell_x, cell_y)].halite_amount = cell_energy
+        # Cell update lines are "x y halite"; read and apply all of them at once
+        updates = read_values(int(read_input())).reshape(-1, 3)
+        xs, ys = updates[:, 0], updates[:, 1]
+        changes = np.column_stack((xs, ys, self.halite[ys, xs], updates[:, 2]))
+        self.halite[ys, xs] = updates[:, 2]
+        return changes
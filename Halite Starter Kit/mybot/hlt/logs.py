@@ -0,0 +1,140 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+
+from . import common
+
+
+class ThreadFilter(logging.Filter):
+    """
+    Only lets through the records logged from one thread, for bots sharing a process.
+    """
+    def __init__(self, thread=None):
+        """
+        :param thread: The thread identifier, defaulting to the calling thread's
+        """
+        super().__init__()
+        self.thread = threading.get_ident() if thread is None else thread
+
+    def filter(self, record):
+        return record.thread == self.thread
+
+
+def _set_root_level(level, handler, thread_only):
+    """
+    Let records of level through the root logger. Next to other bots, the root logger keeps
+    the lowest level asked for and the handler filters its own.
+    """
+    root = logging.getLogger()
+    if thread_only:
+        root.setLevel(min(root.level, level))
+        handler.setLevel(level)
+    else:
+        root.setLevel(level)
+
+
+def thread_file_logging(filename, level=logging.DEBUG, fmt=logging.BASIC_FORMAT):
+    """
+    Log the records of the calling thread to a file, for a bot sharing its process with other
+    bots (see hlt.common.isolate_logging). The file is closed when the engine closes the input stream.
+    :param filename: The log file, overwritten
+    :param level: The lowest level to log
+    :param fmt: The format of the records in the file
+    :return: The file handler
+    """
+    handler = logging.FileHandler(filename, mode="w")
+    handler.setFormatter(logging.Formatter(fmt))
+    handler.addFilter(ThreadFilter())
+    root = logging.getLogger()
+    root.addHandler(handler)
+    _set_root_level(level, handler, True)
+
+    def close():
+        root.removeHandler(handler)
+        handler.close()
+    common.at_end_of_input(close)
+    return handler
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler for a bounded queue which drops records rather than block the bot when the queue is full.
+    """
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _DrainingQueueListener(logging.handlers.QueueListener):
+    """
+    A QueueListener whose stop waits for room in a full queue instead of failing.
+    """
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class AsyncLogging:
+    """
+    Logging to a file from a background thread, so that the bot never waits on disk I/O.
+
+    The root logger gets a DroppingQueueHandler feeding a bounded queue, which a QueueListener
+    drains into the file. Records below level are rejected by the logger before their message
+    is formatted, so log with %-style arguments (logging.debug("ship %s", ship)) rather than
+    f-strings. The queue is drained when the engine closes the input stream and at exit, so
+    no queued record is lost.
+    """
+    def __init__(self, filename, level=logging.DEBUG, capacity=10000,
+                 fmt=logging.BASIC_FORMAT, thread_only=False):
+        """
+        :param filename: The log file, overwritten
+        :param level: The lowest level to log
+        :param capacity: The most records to hold in memory before dropping new ones
+        :param fmt: The format of the records in the file
+        :param thread_only: Whether to only log the records of the calling thread, for a bot
+                            sharing its process with other bots (see hlt.common.isolate_logging)
+        """
+        self.file_handler = logging.FileHandler(filename, mode="w")
+        self.file_handler.setFormatter(logging.Formatter(fmt))
+        self.queue = queue.Queue(capacity)
+        self.handler = DroppingQueueHandler(self.queue)
+        if thread_only:
+            self.handler.addFilter(ThreadFilter())
+        self.listener = _DrainingQueueListener(self.queue, self.file_handler)
+
+        logging.getLogger().addHandler(self.handler)
+        _set_root_level(level, self.handler, thread_only)
+        self.listener.start()
+        self._running = True
+        common.at_end_of_input(self.stop)
+        atexit.register(self.stop)
+
+    @property
+    def dropped(self):
+        """
+        :return: How many records were dropped because the queue was full
+        """
+        return self.handler.dropped
+
+    def stop(self):
+        """
+        Write out every queued record and stop the background thread. Safe to call more than once.
+        """
+        if not self._running:
+            return
+        self._running = False
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+        if self.dropped:
+            self.file_handler.handle(logging.makeLogRecord({
+                'name': 'root', 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': "Dropped %d log records because the queue was full", 'args': (self.dropped,),
+            }))
+        self.file_handler.close()
@@ -0,0 +1,135 @@
+import numpy as np
+
+from . import constants
+
+
+class MiningMaps:
+    """
+    Inspiration and expected mining yield of every cell for one player, for the current turn.
+
+    A ship is inspired when at least INSPIRATION_SHIP_COUNT opponent ships are within
+    INSPIRATION_RADIUS of it; the opponent ship counts come from a single convolution of the
+    opponent ship grid with the Manhattan diamond. All maps are arrays indexed [y, x].
+    """
+    def __init__(self, game, player_id=None):
+        """
+        :param game: The Game, after update_frame
+        :param player_id: The player to compute the maps for, defaulting to you
+        """
+        game_map = game.game_map
+        player_id = game.my_id if player_id is None else player_id
+        self.halite = game_map.halite_grid()
+
+        # Opponent ships on every cell
+        self.opponent_ships = game.ships.counts(exclude=player_id)
+
+        # Opponent ships within the inspiration radius of every cell
+        self.nearby_opponents = game.ships.threats(player_id, constants.INSPIRATION_RADIUS)
+
+        # Whether a ship of player_id would be inspired on every cell
+        self.inspired = self.nearby_opponents >= constants.INSPIRATION_SHIP_COUNT
+        if not constants.INSPIRATION_ENABLED:
+            self.inspired[:] = False
+
+        # The extraction ratio of every cell
+        self.extract_ratios = np.where(self.inspired, constants.INSPIRED_EXTRACT_RATIO, constants.EXTRACT_RATIO)
+
+        # Halite taken off every cell by one turn of mining
+        self.extracted = -(-self.halite // self.extract_ratios)
+
+        # Halite gained by the ship for one turn of mining every cell, before its cargo limit
+        bonus = (self.extracted * constants.INSPIRED_BONUS_MULTIPLIER).astype(np.int64)
+        self.yield_per_turn = self.extracted + np.where(self.inspired, bonus, 0)
+
+
+class MiningTargets:
+    """
+    Picks a distinct cell for each of your ships to mine, once per turn.
+
+    Every cell is scored for every ship by the halite the ship would bring home per turn
+    spent: what mining_turns turns on the cell yield (with inspiration, up to the ship's
+    free cargo), minus the estimated cost of moving there, off it and back, divided by the
+    turns to get there, mine and return to the nearest shipyard or dropoff. Distances come
+    from the cached distance fields of the map, so scoring is a few array operations per
+    ship. Ships are then matched to distinct cells greedily, best pair first.
+    """
+    def __init__(self, game, maps=None, mining_turns=5, min_halite=0):
+        """
+        :param game: The Game, after update_frame
+        :param maps: The MiningMaps of this turn for you, computed if not given
+        :param mining_turns: How many turns a ship is expected to mine its target
+        :param min_halite: Cells with no more halite than this are not worth mining
+        """
+        self.game_map = game.game_map
+        self.maps = MiningMaps(game) if maps is None else maps
+        self.mining_turns = mining_turns
+
+        # Halite gained by mining_turns turns on every cell
+        kept = 1 - 1 / self.maps.extract_ratios
+        gain = self.maps.halite * (1 - kept ** mining_turns)
+        self.gain = np.where(self.maps.inspired, gain * (1 + constants.INSPIRED_BONUS_MULTIPLIER), gain)
+
+        self.home_distances, _ = self.game_map.nearest_structure_map(game.me)
+        # The average cost of one move, and the cost of leaving every cell once mined
+        self.move_cost = self.maps.halite.mean() / constants.MOVE_COST_RATIO
+        self.leave_cost = self.maps.halite * kept ** mining_turns / constants.MOVE_COST_RATIO
+
+        # Cells holding a structure cannot be mined
+        self.minable = self.maps.halite > min_halite
+        self.minable[self.home_distances == 0] = False
+
+    def scores(self, ships):
+        """
+        :param ships: The ships to score cells for
+        :return: A float array indexed [ship, y, x] of the halite per turn each ship would
+                 bring home by mining each cell, -inf where a cell cannot be mined
+        """
+        distances = self.game_map.distances
+        travel = np.stack([distances.field(self.game_map.positions.index(ship.position)) for ship in ships])
+        room = np.array([constants.MAX_HALITE - ship.halite_amount for ship in ships], dtype=np.float64)
+
+        gain = np.minimum(self.gain[None], room[:, None, None])
+        cost = (travel + self.home_distances[None]) * self.move_cost + self.leave_cost[None]
+        turns = travel + self.home_distances[None] + self.mining_turns
+        scores = (gain - cost) / turns
+        scores[:, ~self.minable] = -np.inf
+        return scores
+
+    def assign(self, ships, taken=()):
+        """
+        Match ships to distinct cells. Ships are only matched to cells which can be mined, so
+        when there are fewer of those than ships, some ships get no target.
+        :param ships: The ships needing a target
+        :param taken: Positions no ship may be assigned, e.g. targets kept from earlier turns
+        :return: A dict of ship id to the position of its target
+        """
+        ships = list(ships)
+        if not ships:
+            return {}
+        positions = self.game_map.positions
+        scores = self.scores(ships).reshape(len(ships), -1)
+        for position in taken:
+            scores[:, positions.index(position)] = -np.inf
+
+        # Each ship's len(ships) best cells are enough for every ship to get one
+        count = min(len(ships), scores.shape[1])
+        best = np.argpartition(-scores, count - 1, axis=1)[:, :count]
+        candidates = np.unique(best)
+        pairs = scores[:, candidates]
+        order = np.argsort(-pairs, axis=None, kind='stable')
+
+        targets = {}
+        used = set()
+        for slot, column in zip(*(axis.tolist() for axis in np.unravel_index(order, pairs.shape))):
+            if not np.isfinite(pairs[slot, column]):
+                # The pairs are sorted, so no minable cell is left
+                break
+            ship = ships[slot]
+            cell = int(candidates[column])
+            if ship.id in targets or cell in used:
+                continue
+            targets[ship.id] = positions.positions[cell]
+            used.add(cell)
+            if len(targets) == len(ships):
+                break
+        return targets
@@ -0,0 +1,235 @@
+import functools
+import heapq
+import time
+
+from . import constants
+from .distances import DistanceTable
+from .game_map import ArrayGameMap
+from .positionals import Direction, PositionTable
+
+# Direction of each slot of PositionTable.neighbors
+_NEIGHBOR_DIRECTIONS = Direction.get_all_cardinals()
+
+# How many cells to settle between two looks at the clock
+_CLOCK_INTERVAL = 64
+
+
+class _SearchTree:
+    """
+    A resumable Dijkstra search growing backwards from one destination.
+    """
+    __slots__ = ('costs', 'settled', 'heap')
+
+    def __init__(self, size, destination):
+        self.costs = [float('inf')] * size
+        self.settled = [False] * size
+        self.costs[destination] = 0
+        self.heap = [(0, destination)]
+
+
+class Navigator:
+    """
+    Cost-aware pathfinding over the wrapped game map.
+
+    Moving off a cell costs 1/MOVE_COST_RATIO of its halite, every move also costs
+    turn_cost and entering a cell which holds a ship costs occupied_cost on top.
+    Create one Navigator per turn: the costs are read once from the map and searches
+    towards a destination are kept and resumed, so ships heading to the same place
+    share the work. Once time_budget seconds have passed since creation, searches stop
+    and navigation falls back to GameMap.get_unsafe_moves.
+    """
+    def __init__(self, game_map, turn_cost=10, occupied_cost=50, time_budget=None):
+        self.game_map = game_map
+        self.positions = game_map.positions
+        self.turn_cost = turn_cost
+        self.occupied_cost = occupied_cost
+        self.deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+        if isinstance(game_map, ArrayGameMap):
+            halite = game_map.halite.ravel().tolist()
+            occupied = game_map.occupied_mask().ravel().tolist()
+        else:
+            cells = game_map._flat_cells
+            halite = [cell.halite_amount for cell in cells]
+            occupied = [cell.is_occupied for cell in cells]
+        self._move_costs = [amount // constants.MOVE_COST_RATIO for amount in halite]
+        self._leave_costs = [cost + turn_cost for cost in self._move_costs]
+        self._enter_costs = [occupied_cost if taken else 0 for taken in occupied]
+        self._trees = {}
+
+    @property
+    def out_of_time(self):
+        """
+        :return: Whether the time budget is spent
+        """
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def _cost_to(self, source, destination):
+        """
+        Grow the search tree of destination until source is settled.
+        :param source: The row-major index of the start cell
+        :param destination: The row-major index of the end cell
+        :return: The cost of the cheapest path, or None if the time budget ran out
+        """
+        tree = self._trees.get(destination)
+        if tree is None:
+            tree = self._trees[destination] = _SearchTree(self.positions.size, destination)
+        costs, settled, heap = tree.costs, tree.settled, tree.heap
+        neighbors = self.positions.neighbors
+        leave_costs = self._leave_costs
+        enter_costs = self._enter_costs
+        expanded = 0
+
+        while not settled[source]:
+            if not heap:
+                return None
+            expanded += 1
+            if expanded % _CLOCK_INTERVAL == 0 and self.out_of_time:
+                return None
+            cost, index = heapq.heappop(heap)
+            if settled[index]:
+                continue
+            settled[index] = True
+            # Walk edges backwards: moving from a neighbor onto index
+            step = enter_costs[index]
+            for neighbor in neighbors[index]:
+                if not settled[neighbor]:
+                    new_cost = cost + step + leave_costs[neighbor]
+                    if new_cost < costs[neighbor]:
+                        costs[neighbor] = new_cost
+                        heapq.heappush(heap, (new_cost, neighbor))
+        return costs[source]
+
+    def ranked_moves(self, ship, destination):
+        """
+        Rank the moves available to a ship by the cost of the cheapest path through them.
+        Does not check for collisions.
+        :param ship: The ship to move
+        :param destination: Ending position
+        :return: A list of Directions, cheapest first. Still is always last, or the only
+                 entry when the ship is at its destination or cannot pay to move.
+        """
+        source = self.positions.index(ship.position)
+        target = self.positions.index(destination)
+        if source == target or ship.halite_amount < self._move_costs[source]:
+            return [Direction.Still]
+
+        ranked = []
+        leave_cost = self._leave_costs[source]
+        for direction, neighbor in zip(_NEIGHBOR_DIRECTIONS, self.positions.neighbors[source]):
+            cost = self._cost_to(neighbor, target)
+            if cost is None:
+                return self.game_map.get_unsafe_moves(ship.position, destination) + [Direction.Still]
+            ranked.append((leave_cost + self._enter_costs[neighbor] + cost, direction))
+        ranked.sort()
+        return [direction for _, direction in ranked] + [Direction.Still]
+
+    def navigate(self, ship, destination):
+        """
+        Returns the first move of the cheapest path towards the destination.
+        Does not check for collisions.
+        :param ship: The ship to move
+        :param destination: Ending position
+        :return: A direction.
+        """
+        return self.ranked_moves(ship, destination)[0]
+
+    def path(self, source, destination):
+        """
+        Find the cheapest path between two positions.
+        :param source: The starting position
+        :param destination: Ending position
+        :return: The list of positions after source up to and including destination,
+                 or None if the time budget ran out
+        """
+        start = self.positions.index(source)
+        target = self.positions.index(destination)
+        if self._cost_to(start, target) is None:
+            return None
+
+        costs = self._trees[target].costs
+        neighbors = self.positions.neighbors
+        path = []
+        index = start
+        while index != target:
+            step = self._leave_costs[index]
+            index = min(neighbors[index], key=lambda neighbor: step + self._enter_costs[neighbor] + costs[neighbor])
+            path.append(self.positions.positions[index])
+        return path
+
+
+@functools.lru_cache(maxsize=64)
+def _return_moves(width, height, indices):
+    """
+    :param indices: A sorted tuple of the row-major indices of the structures to head to
+    :return: For every cell index, the tuple of cardinal Directions ranked by the wrapped
+             distance to the closest structure they lead to, or (Direction.Still,) on a structure
+    """
+    neighbors = PositionTable.get(width, height).neighbors
+    distances = DistanceTable.get(width, height).multi_field(indices).ravel().tolist()
+    moves = []
+    for index, around in enumerate(neighbors):
+        if distances[index] == 0:
+            moves.append((Direction.Still,))
+            continue
+        ranked = sorted(range(len(around)), key=lambda slot: distances[around[slot]])
+        moves.append(tuple(_NEIGHBOR_DIRECTIONS[slot] for slot in ranked))
+    return moves
+
+
+class ReturnPlanner:
+    """
+    Routes ships back to the closest of a player's shipyard and dropoffs.
+
+    Distances are wrapped, so ships take the short way around the map. The moves of every
+    cell are ranked once per set of structures and shared across turns, so a returning
+    ship's moves are a single lookup. Does not account for halite on the way nor for collisions.
+    """
+    def __init__(self, game_map, player):
+        """
+        :param game_map: The game map of this turn
+        :param player: The player whose structures to return to
+        """
+        self.game_map = game_map
+        self.positions = game_map.positions
+        structures = [player.shipyard] + player.get_dropoffs()
+        self.indices = tuple(sorted({self.positions.index(structure.position) for structure in structures}))
+        self.distances = game_map.distances.multi_field(self.indices)
+        self._distances = self.distances.ravel()
+        self._moves = _return_moves(game_map.width, game_map.height, self.indices)
+
+    def distance(self, ship):
+        """
+        :param ship: Any ship or position
+        :return: The number of moves to the closest structure
+        """
+        return int(self._distances[self.positions.index(getattr(ship, 'position', ship))])
+
+    def ranked_moves(self, ship):
+        """
+        :param ship: The ship to move
+        :return: A list of Directions, those closing in on the closest structure first. Still
+                 is always last, or the only entry when the ship is on a structure.
+        """
+        moves = self._moves[self.positions.index(ship.position)]
+        if moves[0] == Direction.Still:
+            return [Direction.Still]
+        return list(moves) + [Direction.Still]
+
+    def away_moves(self, ship):
+        """
+        :param ship: The ship to move
+        :return: A list of Directions, those leading away from the closest structure first.
+                 Still is always last.
+        """
+        moves = self._moves[self.positions.index(ship.position)]
+        if moves[0] == Direction.Still:
+            return Direction.get_all_cardinals() + [Direction.Still]
+        return list(reversed(moves)) + [Direction.Still]
+
+    def navigate(self, ship):
+        """
+        :param ship: The ship to move
+        :return: The first move of a shortest path to the closest structure
+        """
+        return self._moves[self.positions.index(ship.position)][0]
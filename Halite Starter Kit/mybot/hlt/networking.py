@@ -1,22 +1,56 @@
 import json
 import logging
-import sys
 
-from .common import read_input
+from .common import logging_isolated, read_input, output_stream
 from . import constants
-from .game_map import GameMap, Player
+from .entity import ShipRegistry
+from .game_map import ArrayGameMap, GameMap
+from .logs import AsyncLogging, thread_file_logging
+from .player import Player
+from .ships import ShipIndex
+
+
+class FrameDelta:
+    """
+    What changed between the previous frame and the current one.
+    """
+    def __init__(self):
+        # Ships which appeared this turn
+        self.new_ships = []
+        # Ships which are gone this turn, in their last known state
+        self.destroyed_ships = []
+        # (ship, previous position) for every ship which moved
+        self.moved_ships = []
+        # Dropoffs which appeared this turn
+        self.new_dropoffs = []
+        # A row (x, y, previous halite, halite) for every cell whose halite changed
+        self.changed_cells = None
 
 
 class Game:
     """
     The game object holds all metadata pertinent to the game and all its contents
     """
-    def __init__(self):
+    def __init__(self, array_map=False, profiler=None, async_logging=False, log_level=logging.DEBUG,
+                 replay_path=None):
         """
         Initiates a game object collecting all start-state instances for the contained items for pre-game.
         Also sets up basic logging.
+        :param array_map: Whether to store the map in NumPy arrays (see ArrayGameMap)
+        :param profiler: A TurnProfiler to time every turn with, or None
+        :param async_logging: Whether to write the log from a background thread (see AsyncLogging)
+        :param log_level: The lowest level to log
+        :param replay_path: If given, record the game there (see ReplayRecorder)
         """
+        # Start recording before anything is read
+        self.recorder = None
+        if replay_path is not None:
+            # Imported here so that python -m hlt.replay does not find it imported already
+            from .replay import ReplayRecorder
+            self.recorder = ReplayRecorder(replay_path)
         self.turn_number = 0
+        self.profiler = profiler
+        self.delta = FrameDelta()
 
         # Grab constants JSON
         raw_constants = read_input()
@@ -24,19 +58,36 @@ class Game:
 
         num_players, self.my_id = map(int, read_input().split())
 
-        logging.basicConfig(
-            filename="bot-{}.log".format(self.my_id),
-            filemode="w",
-            level=logging.DEBUG,
-        )
-
+        # Like logging.basicConfig, leave logging alone if it is already set up, except next to
+        # other bots in the same process: there every bot logs the records of its own thread
+        self.logging = None
+        filename = "bot-{}.log".format(self.my_id)
+        isolated = logging_isolated()
+        if async_logging and (isolated or not logging.getLogger().handlers):
+            self.logging = AsyncLogging(filename, level=log_level, thread_only=isolated)
+        elif isolated:
+            thread_file_logging(filename, level=log_level)
+        else:
+            logging.basicConfig(
+                filename=filename,
+                filemode="w",
+                level=log_level,
+            )
+
+        # Every live ship of this game, keyed by (owner, id)
+        self.registry = ShipRegistry()
         self.players = {}
         for player in range(num_players):
-            self.players[player] = Player._generate()
+            self.players[player] = Player._generate(self.registry)
         self.me = self.players[self.my_id]
-        self.game_map = GameMap._generate()
+        self.game_map = ArrayGameMap._generate() if array_map else GameMap._generate()
 
         constants.set_dimensions(self.game_map.width, self.game_map.height)
+        for player in self.players.values():
+            player.shipyard.position = self.game_map.normalize(player.shipyard.position)
+            # Shipyards never move, so they only need to be placed once
+            self.game_map[player.shipyard].structure = player.shipyard
+        self.ships = ShipIndex(self.game_map, self.players)
 
     def ready(self, name):
         """
@@ -48,34 +99,58 @@ class Game:
     def update_frame(self):
         """
         Updates the game object's state.
+        What changed since the previous frame is available in self.delta afterwards,
+        and the ships of all players are indexed in self.ships.
         :returns: nothing.
         """
+        if self.recorder is not None:
+            self.recorder.next_segment()
         self.turn_number = int(read_input())
-        logging.info("=============== TURN {:03} ================".format(self.turn_number))
+        if self.profiler is not None:
+            self.profiler.start_turn()
+        logging.info("=============== TURN %03d ================", self.turn_number)
 
+        self.delta = FrameDelta()
         for _ in range(len(self.players)):
             player, num_ships, num_dropoffs, halite = map(int, read_input().split())
-            self.players[player]._update(num_ships, num_dropoffs, halite)
+            self.players[player]._update(num_ships, num_dropoffs, halite, self.delta)
 
-        self.game_map._update()
+        self.delta.changed_cells = self.game_map._update()
+        self.ships = ShipIndex(self.game_map, self.players)
 
         # Mark cells with ships as unsafe for navigation
-        for player in self.players.values():
-            for ship in player.get_ships():
-                self.game_map[ship.position].mark_unsafe(ship)
+        self.game_map._mark_ships(self.ships)
+
+        for dropoff in self.delta.new_dropoffs:
+            self.game_map[dropoff].structure = dropoff
 
-            self.game_map[player.shipyard.position].structure = player.shipyard
-            for dropoff in player.get_dropoffs():
-                self.game_map[dropoff.position].structure = dropoff
+        if self.profiler is not None:
+            self.profiler.end_phase()
 
     @staticmethod
     def end_turn(commands):
         """
         Method to send all commands to the game engine, effectively ending your turn.
+        Does not time the turn; use finish_turn for that.
+        :param commands: Array of commands to send to engine
+        :return: nothing.
+        """
+        send_commands(commands)
+
+    def finish_turn(self, commands):
+        """
+        Like end_turn, timing the turn with the profiler if there is one.
         :param commands: Array of commands to send to engine
         :return: nothing.
         """
+        if self.profiler is None:
+            send_commands(commands)
+            return
+        self.profiler.end_phase()
+        self.profiler.check_time(self.turn_number)
         send_commands(commands)
+        self.profiler.end_phase()
+        self.profiler.end_turn(self.turn_number)
 
 
 def send_commands(commands):
@@ -84,5 +159,6 @@ def send_commands(commands):
     :param commands: The list of commands to send.
     :return: nothing.
     """
-    print(" ".join(commands))
-    sys.stdout.flush()
+    stream = output_stream()
+    stream.write((" ".join(commands) + "\n").encode())
+    stream.flush()
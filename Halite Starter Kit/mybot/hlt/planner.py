@@ -0,0 +1,155 @@
+from . import constants
+from .positionals import Direction
+
+
+class MovePlanner:
+    """
+    Resolves the moves of all ships of a turn jointly, so that no two of them end on the same cell.
+
+    Request every ship's moves (ranked by preference) once per turn, then call resolve.
+    Ships are matched to distinct destination cells with augmenting paths: a ship may
+    push an earlier ship to another cell that ship ranked as high, chains of ships
+    moving into each other's cells are kept and a ship falls back to staying still
+    when nothing else fits. Ships which were not requested are not moved and are not
+    accounted for, so request all of your ships.
+    """
+    def __init__(self, game_map, allow_swaps=True):
+        """
+        :param game_map: The game map of this turn
+        :param allow_swaps: Whether two ships may trade places. If False, both stay still instead.
+        """
+        self.game_map = game_map
+        self.positions = game_map.positions
+        self.allow_swaps = allow_swaps
+        self._ships = []
+        self._sources = []
+        self._candidates = []
+        self._reserved = set()
+        self._shared = set()
+        self._assigned = None
+        self._holders = None
+
+    def reserve(self, position):
+        """
+        Keep ships from ending their move on a cell, e.g. the shipyard when spawning.
+        A ship which cannot move off a reserved cell still stays on it.
+        :param position: The cell to keep free
+        """
+        self._reserved.add(self.positions.index(position))
+
+    def share(self, position):
+        """
+        Let any number of ships end their move on a cell, e.g. your structures on the last
+        turn, where colliding ships still deposit their cargo.
+        :param position: The cell to share
+        """
+        self._shared.add(self.positions.index(position))
+
+    def request(self, ship, directions):
+        """
+        Ask for a ship to move.
+        :param ship: The ship to move
+        :param directions: The acceptable directions, most preferred first. Staying still is
+                           implied as the last resort.
+        """
+        source = self.positions.index(ship.position)
+        if ship.halite_amount < self.game_map[ship.position].halite_amount // constants.MOVE_COST_RATIO:
+            directions = ()
+
+        candidates = []
+        for direction in directions:
+            target = self.positions.index(ship.position.directional_offset(direction))
+            if target not in candidates:
+                candidates.append(target)
+        if source not in candidates:
+            candidates.append(source)
+        self._ships.append(ship)
+        self._sources.append(source)
+        self._candidates.append(candidates)
+
+    def _augment(self, slot, target, visited, strict):
+        """
+        Try to give a cell to a ship, moving the ship which holds it elsewhere if needed.
+        :param slot: The ship's slot
+        :param target: The cell index
+        :param visited: Cells already tried while looking for this augmenting path
+        :param strict: Whether displaced ships may only move to cells they ranked as high
+        :return: Whether the ship got the cell
+        """
+        if target in visited:
+            return False
+        visited.add(target)
+
+        holder = self._holders.get(target)
+        if holder is not None and target not in self._shared:
+            candidates = self._candidates[holder]
+            limit = candidates.index(target) + 1 if strict else len(candidates)
+            for other in candidates[:limit]:
+                if other != target and self._augment(holder, other, visited, strict):
+                    break
+            else:
+                return False
+
+        self._holders[target] = slot
+        self._assigned[slot] = target
+        return True
+
+    def _assign(self, slot, strict):
+        """
+        Give a ship the first of its candidate cells for which an augmenting path exists.
+        :return: Whether the ship got a cell
+        """
+        for target in self._candidates[slot]:
+            if self._augment(slot, target, set(), strict):
+                return True
+        return False
+
+    def resolve(self):
+        """
+        Match every requested ship to a distinct destination.
+        :return: The list of move commands, one per requested ship
+        """
+        self._candidates = [[target for target in candidates if target == source or target not in self._reserved]
+                            for source, candidates in zip(self._sources, self._candidates)]
+        self._assigned = [None] * len(self._ships)
+        self._holders = {}
+        for slot in range(len(self._ships)):
+            if not self._assign(slot, True):
+                self._assign(slot, False)
+
+        if not self.allow_swaps:
+            sources = {source: slot for slot, source in enumerate(self._sources)}
+            for slot, target in enumerate(self._assigned):
+                other = sources.get(target)
+                if other is not None and other != slot and self._assigned[other] == self._sources[slot]:
+                    self._assigned[slot] = self._sources[slot]
+                    self._assigned[other] = self._sources[other]
+            self._holders = {target: slot for slot, target in enumerate(self._assigned)}
+
+        return [ship.move(self._direction(slot)) for slot, ship in enumerate(self._ships)]
+
+    def _direction(self, slot):
+        """
+        :return: The Direction taking a ship to its assigned cell
+        """
+        source = self._sources[slot]
+        target = self._assigned[slot]
+        if target == source:
+            return Direction.Still
+        return Direction.get_all_cardinals()[self.positions.neighbors[source].index(target)]
+
+    def is_claimed(self, position):
+        """
+        Check whether a requested ship ends the turn on a cell. Only meaningful after resolve.
+        :param position: The cell to check
+        :return: True if and only if a ship was assigned there.
+        """
+        return self.positions.index(position) in self._holders
+
+    def destination_of(self, ship):
+        """
+        :param ship: A requested ship
+        :return: The position the ship was assigned after resolve
+        """
+        slot = self._ships.index(ship)
+        return self.positions.positions[self._assigned[slot]]
@@ -1,18 +1,21 @@
-from .entity import Shipyard, Ship, Dropoff
-from .positionals import Position
-from .positionals import Position
-from .common import read_input
+from . import constants
+from .entity import Shipyard, ShipRegistry, Dropoff
+from .positionals import Position, PositionTable
+from .common import read_input, read_values
 
 class Player:
     """
     Player object containing all items/metadata pertinent to the player.
     """
-    def __init__(self, player_id, shipyard, halite=0):
+    def __init__(self, player_id, shipyard, halite=0, registry=None):
         self.id = player_id
         self.shipyard = shipyard
         self.halite_amount = halite
         self._ships = {}
+        self._ship_list = []
         self._dropoffs = {}
+        # Shared by all players of a game
+        self._registry = ShipRegistry() if registry is None else registry
 
     def get_ship(self, ship_id):
         """
@@ -24,9 +27,10 @@ class Player:
 
     def get_ships(self):
         """
-        :return: Returns all ship objects in a list
+        :return: Returns all ship objects in a list. The list is shared until the ships
+                 change, so do not modify it.
         """
-        return list(self._ships.values())
+        return self._ship_list
 
     def get_dropoff(self, dropoff_id):
         """
@@ -56,22 +60,66 @@ class Player:
 
 
     @staticmethod
-    def _generate():
+    def _generate(registry=None):
         """
         Creates a player object from the input given by the game engine
+        :param registry: The ShipRegistry of the game
         :return: The player object
         """
         player, shipyard_x, shipyard_y = map(int, read_input().split())
-        return Player(player, Shipyard(player, -1, Position(shipyard_x, shipyard_y, normalize=False)))
+        return Player(player, Shipyard(player, -1, Position(shipyard_x, shipyard_y, normalize=False)),
+                      registry=registry)
 
-    def _update(self, num_ships, num_dropoffs, halite):
+    def _update(self, num_ships, num_dropoffs, halite, delta=None):
         """
         Updates this player object considering the input from the game engine for the current specific turn.
+        Only ships which appeared, moved or disappeared and dropoffs which appeared are touched.
         :param num_ships: The number of ships this player has this turn
         :param num_dropoffs: The number of dropoffs this player has this turn
         :param halite: How much halite the player has in total
+        :param delta: If given, the FrameDelta to record this player's changes in
         :return: nothing.
         """
         self.halite_amount = halite
-        self._ships = {id: ship for (id, ship) in [Ship._generate(self.id) for _ in range(num_ships)]}
-        self._dropoffs = {id: dropoff for (id, dropoff) in [Dropoff._generate(self.id) for _ in range(num_dropoffs)]}
+        # Ship lines are "id x y halite" and dropoff lines "id x y"; read all of them at once
+        values = read_values(num_ships + num_dropoffs).tolist()
+        positions = PositionTable.get(constants.WIDTH, constants.HEIGHT)
+
+        ships = self._ships
+        seen = set()
+        joined = False
+        for offset in range(0, 4 * num_ships, 4):
+            ship_id, x_position, y_position, ship_halite = values[offset:offset + 4]
+            position = positions.at(x_position, y_position)
+            ship = ships.get(ship_id)
+            if ship is None:
+                ship = ships[ship_id] = self._registry.create(self.id, ship_id, position, ship_halite)
+                joined = True
+                if delta is not None:
+                    delta.new_ships.append(ship)
+            else:
+                if ship.position != position:
+                    if delta is not None:
+                        delta.moved_ships.append((ship, ship.position))
+                    ship.position = position
+                ship.halite_amount = ship_halite
+            seen.add(ship_id)
+
+        left = len(seen) != len(ships)
+        if left:
+            for ship_id in [ship_id for ship_id in ships if ship_id not in seen]:
+                ship = ships.pop(ship_id)
+                self._registry.evict(ship)
+                if delta is not None:
+                    delta.destroyed_ships.append(ship)
+        if joined or left:
+            self._ship_list = list(ships.values())
+
+        # Dropoffs never move nor disappear
+        for offset in range(4 * num_ships, len(values), 3):
+            dropoff_id, x_position, y_position = values[offset:offset + 3]
+            if dropoff_id not in self._dropoffs:
+                dropoff = Dropoff._create(self.id, dropoff_id, positions.at(x_position, y_position))
+                self._dropoffs[dropoff_id] = dropoff
+                if delta is not None:
+                    delta.new_dropoffs.append(dropoff)
@@ -28,17 +28,9 @@ class Direction:
         :param direction: the direction in this notation
         :return: The character equivalent for the game engine
         """
-        if direction == Direction.North:
-            return commands.NORTH
-        if direction == Direction.South:
-            return commands.SOUTH
-        if direction == Direction.East:
-            return commands.EAST
-        if direction == Direction.West:
-            return commands.WEST
-        if direction == Direction.Still:
-            return commands.STAY_STILL
-        else:
+        try:
+            return _DIRECTION_CODES[direction]
+        except KeyError:
             raise IndexError
 
     @staticmethod
@@ -63,6 +55,8 @@ class Direction:
 
 
 class Position:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y, normalize=True):
         self.x = x
         self.y = y
@@ -80,7 +74,7 @@ class Position:
         :param direction: the direction cardinal tuple
         :return: a new position moved in that direction
         """
-        return self + Position(*direction)
+        return Position(self.x + direction[0], self.y + direction[1])
 
     def get_surrounding_cardinals(self):
         """
@@ -122,3 +116,143 @@ class Position:
 
     def __hash__(self):
         return hash((self.x, self.y))
+
+
+class FixedPosition(Position):
+    """
+    An immutable, normalized position interned by a PositionTable.
+
+    Arithmetic and directional offsets return the interned positions of the
+    same table, so they do not allocate.
+    """
+    __slots__ = ('index', '_table', '_hash')
+
+    def __init__(self, table, x, y, index):
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+        object.__setattr__(self, 'index', index)
+        object.__setattr__(self, '_table', table)
+        object.__setattr__(self, '_hash', hash((x, y)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
+
+    def normalize(self):
+        pass
+
+    def directional_offset(self, direction):
+        """
+        Returns the position considering a Direction cardinal tuple
+        :param direction: the direction cardinal tuple
+        :return: the interned position moved in that direction
+        """
+        slot = _DIRECTION_SLOTS.get(direction)
+        if slot is None:
+            return self._table.at(self.x + direction[0], self.y + direction[1])
+        return self._table.moves[self.index][slot]
+
+    def get_surrounding_cardinals(self):
+        """
+        :return: Returns a tuple of the interned positions around this position (north, south, east, west)
+        """
+        return self._table.cardinals[self.index]
+
+    def __add__(self, other):
+        return self._table.at(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return self._table.at(self.x - other.x, self.y - other.y)
+
+    def __iadd__(self, other):
+        return self + other
+
+    def __isub__(self, other):
+        return self - other
+
+    def __abs__(self):
+        return self
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return Position, (self.x, self.y, False)
+
+
+# Engine character of each direction
+_DIRECTION_CODES = {
+    Direction.North: commands.NORTH,
+    Direction.South: commands.SOUTH,
+    Direction.East: commands.EAST,
+    Direction.West: commands.WEST,
+    Direction.Still: commands.STAY_STILL,
+}
+
+# Slot of each direction within PositionTable.moves
+_DIRECTION_SLOTS = {
+    Direction.North: 0,
+    Direction.South: 1,
+    Direction.East: 2,
+    Direction.West: 3,
+    Direction.Still: 4,
+}
+
+
+class PositionTable:
+    """
+    The interned FixedPositions of one map size, along with precomputed neighbor tables.
+
+    Cells are numbered row-major, i.e. index = y * width + x. Use PositionTable.get to
+    share one table per map size.
+    """
+    _tables = {}
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.positions = [FixedPosition(self, index % width, index // width, index)
+                          for index in range(self.size)]
+
+        # For every index, the indices of its north, south, east and west neighbors
+        self.neighbors = [
+            tuple(((y + dy) % height) * width + (x + dx) % width
+                  for dx, dy in Direction.get_all_cardinals())
+            for y in range(height) for x in range(width)
+        ]
+
+        # For every index, the neighboring positions in the same order
+        self.cardinals = [tuple(self.positions[neighbor] for neighbor in neighbors)
+                          for neighbors in self.neighbors]
+
+        # For every index, the positions reached by each direction, ordered as in _DIRECTION_SLOTS
+        self.moves = [cardinals + (position,)
+                      for cardinals, position in zip(self.cardinals, self.positions)]
+
+    @staticmethod
+    def get(width, height):
+        """
+        Returns the shared table for a map size, creating it on first use.
+        :param width: The map width
+        :param height: The map height
+        :return: The PositionTable
+        """
+        table = PositionTable._tables.get((width, height))
+        if table is None:
+            table = PositionTable._tables[(width, height)] = PositionTable(width, height)
+        return table
+
+    def at(self, x, y):
+        """
+        :return: The interned position for these coordinates, accounting for wrap-around
+        """
+        return self.positions[(y % self.height) * self.width + x % self.width]
+
+    def index(self, position):
+        """
+        :param position: Any Position
+        :return: The row-major index of the position, accounting for wrap-around
+        """
+        if position.__class__ is FixedPosition and position._table is self:
+            return position.index
+        return (position.y % self.height) * self.width + position.x % self.width
@@ -0,0 +1,148 @@
+import collections
+import logging
+import sys
+import time
+
+import numpy as np
+
+from . import common
+
+# The phases of a turn, in order
+PHASES = ('update_frame', 'decide', 'end_turn')
+
+# One record per turn: wall time in seconds and net allocated memory blocks of each phase
+TRACE_DTYPE = np.dtype([('turn', '<u2')] +
+                       [(phase, '<f4') for phase in PHASES] + [('total', '<f4')] +
+                       [(phase + '_blocks', '<i4') for phase in PHASES])
+
+
+class TurnProfiler:
+    """
+    Per-turn timing of a bot, enabled by passing one to Game and ending turns with
+    Game.finish_turn.
+
+    Records the wall time and net allocated memory blocks of each phase of every turn:
+    update_frame (parsing the frame), decide (the bot's own code, between update_frame and
+    Game.finish_turn) and end_turn (sending commands). Keeps a rolling p50/p99 of whole turns, warns
+    through logging when a turn comes close to the time limit, before its commands are sent,
+    and can save the trace as CSV or as a compact binary file (a NumPy array of TRACE_DTYPE
+    records). The warning only tells about a slow turn; to stay within the limit, budget the
+    turn's work with time_left().
+    """
+    def __init__(self, time_limit=2.0, warn_fraction=0.8, window=100, path=None):
+        """
+        :param time_limit: The engine's time limit per turn, in seconds
+        :param warn_fraction: Warn when a turn took this fraction of the time limit by the time
+                              its commands are about to be sent
+        :param window: The number of recent turns the percentiles cover
+        :param path: If given, save the trace there when the game ends (.csv for CSV, binary otherwise)
+        """
+        self.time_limit = time_limit
+        self.warn_fraction = warn_fraction
+        self.records = np.zeros(0, dtype=TRACE_DTYPE)
+        self._count = 0
+        self._recent = collections.deque(maxlen=window)
+        self._started = None
+        self._marks = []
+        if path is not None:
+            common.at_end_of_input(lambda: self.save(path))
+
+    def _mark(self):
+        self._marks.append((time.perf_counter(), sys.getallocatedblocks()))
+
+    def start_turn(self):
+        """
+        Called by Game once the turn's frame started arriving.
+        """
+        self._marks = []
+        self._mark()
+        self._started = self._marks[0][0]
+
+    def end_phase(self):
+        """
+        Called by Game at the end of update_frame and at the start and end of finish_turn.
+        """
+        self._mark()
+
+    def check_time(self, turn_number):
+        """
+        Called by Game in finish_turn, before the commands are sent: warns if the turn is close to the time limit.
+        :param turn_number: The current turn
+        """
+        elapsed = self.elapsed()
+        if elapsed >= self.warn_fraction * self.time_limit:
+            logging.warning("Turn %d is at %.3fs of the %.3fs limit before sending its commands",
+                            turn_number, elapsed, self.time_limit)
+
+    def elapsed(self):
+        """
+        :return: Seconds since the current turn started
+        """
+        return 0.0 if self._started is None else time.perf_counter() - self._started
+
+    def time_left(self):
+        """
+        :return: Seconds left before the turn time limit, e.g. to budget a search
+        """
+        return self.time_limit - self.elapsed()
+
+    def end_turn(self, turn_number):
+        """
+        Called by Game once the commands are sent: stores the turn's record.
+        :param turn_number: The turn which just ended
+        """
+        if self._started is None or len(self._marks) != len(PHASES) + 1:
+            return
+        if self._count == len(self.records):
+            self.records = np.resize(self.records, max(64, 2 * self._count))
+        record = self.records[self._count]
+        record['turn'] = turn_number
+        for phase, (start, end) in zip(PHASES, zip(self._marks, self._marks[1:])):
+            record[phase] = end[0] - start[0]
+            record[phase + '_blocks'] = end[1] - start[1]
+        total = self._marks[-1][0] - self._started
+        record['total'] = total
+        self._count += 1
+        self._recent.append(total)
+        self._started = None
+
+    @property
+    def trace(self):
+        """
+        :return: The records of every finished turn
+        """
+        return self.records[:self._count]
+
+    def percentile(self, q):
+        """
+        :param q: The percentile, between 0 and 100
+        :return: That percentile of the recent turn times, in seconds
+        """
+        if not self._recent:
+            return 0.0
+        return float(np.percentile(self._recent, q))
+
+    def summary(self):
+        """
+        :return: A dict with the rolling p50 and p99 and the slowest turn, in seconds
+        """
+        trace = self.trace
+        return {
+            'turns': len(trace),
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'max': float(trace['total'].max()) if len(trace) else 0.0,
+        }
+
+    def save(self, path):
+        """
+        Save the trace: as CSV if path ends with .csv, as raw TRACE_DTYPE records otherwise
+        (load those with numpy.fromfile(path, dtype=TRACE_DTYPE)).
+        :param path: The file to write
+        """
+        trace = self.trace
+        if path.endswith('.csv'):
+            fmt = ['%d'] + ['%.6f'] * (len(PHASES) + 1) + ['%d'] * len(PHASES)
+            np.savetxt(path, trace, fmt=fmt, delimiter=',', header=','.join(TRACE_DTYPE.names), comments='')
+        else:
+            trace.tofile(path)
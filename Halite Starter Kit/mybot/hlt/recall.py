@@ -0,0 +1,69 @@
+import math
+
+from . import constants
+
+
+class RecallScheduler:
+    """
+    Decides when each ship has to head home so that its cargo is deposited before the game ends.
+
+    Only one ship can arrive on a structure per turn without colliding, except on the last
+    turn: ships colliding on their owner's structure still deposit, so up to four ships (one
+    from each side) can arrive then. Arrival turns are handed out per structure from the
+    last turn backwards, the farthest ships getting the latest ones, so the fleet arrives
+    staggered instead of queueing around the structure. A ship has to start out its
+    distance (stretched by slack for detours and waiting) plus margin turns before its
+    arrival turn. Create one per turn.
+    """
+    def __init__(self, game, returns, slack=0.2, margin=2, last_turn_arrivals=4):
+        """
+        :param game: The Game, after update_frame
+        :param returns: The ReturnPlanner of this turn for you
+        :param slack: The fraction of extra turns to expect on the way home
+        :param margin: Turns to spare on top of the travel time
+        :param last_turn_arrivals: How many ships can arrive on a structure on the last turn
+        """
+        self.game = game
+        self.returns = returns
+        self.last_turn = constants.MAX_TURNS
+        game_map = game.game_map
+        _, closest = game_map.distances.nearest(returns.indices)
+        closest = closest.ravel()
+
+        # Farthest ships first, per structure
+        queues = {}
+        for ship in game.me.get_ships():
+            if ship.halite_amount > 0:
+                index = game_map.positions.index(ship.position)
+                queues.setdefault(int(closest[index]), []).append((returns.distance(ship), ship.id))
+
+        self.arrivals = {}
+        self.starts = {}
+        for queue in queues.values():
+            queue.sort(reverse=True)
+            for rank, (distance, ship_id) in enumerate(queue):
+                arrival = self.last_turn - max(0, rank - last_turn_arrivals + 1)
+                self.arrivals[ship_id] = arrival
+                self.starts[ship_id] = arrival - math.ceil(distance * (1 + slack)) - margin + 1
+
+    def latest_start(self, ship):
+        """
+        :param ship: One of your ships
+        :return: The last turn the ship can start home, or None if it carries nothing
+        """
+        return self.starts.get(ship.id)
+
+    def should_recall(self, ship):
+        """
+        :param ship: One of your ships
+        :return: Whether the ship has to head home now
+        """
+        start = self.starts.get(ship.id)
+        return start is not None and self.game.turn_number >= start
+
+    @property
+    def is_last_turn(self):
+        """
+        :return: Whether this turn's moves are the last ones played
+        """
+        return self.game.turn_number >= self.last_turn
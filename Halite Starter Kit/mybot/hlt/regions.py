@@ -0,0 +1,155 @@
+import numpy as np
+
+
+def _summed_area(grid):
+    """
+    :return: The summed-area table of grid, with a leading row and column of zeros
+    """
+    table = np.zeros((grid.shape[0] + 1, grid.shape[1] + 1), dtype=np.int64)
+    np.cumsum(np.cumsum(grid, axis=0, dtype=np.int64), axis=1, out=table[1:, 1:])
+    return table
+
+
+class HaliteSums:
+    """
+    Constant time halite sums over rectangles and Manhattan diamonds of the wrapped map.
+
+    Rectangles are read from a summed-area table over the map tiled twice in each
+    direction, so any wrapped rectangle is a plain one. Diamonds are read from a
+    summed-area table over the map rotated by 45 degrees, in which a diamond is a square;
+    the map is padded with its own wrapped edges first, so diamonds up to max_radius never
+    leave it. Create it once per game and pass it every frame's changed cells: changes
+    are kept aside and added to the answers until there are more than rebuild_threshold
+    of them, then the tables are rebuilt on the next query.
+    """
+    def __init__(self, game_map, max_radius=None, rebuild_threshold=64):
+        """
+        :param game_map: The game map
+        :param max_radius: The largest diamond radius to support, at most (size - 1) // 2 so
+                           that no cell is counted twice. Defaults to that.
+        :param rebuild_threshold: How many changed cells to keep aside before rebuilding
+        """
+        self.width = game_map.width
+        self.height = game_map.height
+        limit = (min(self.width, self.height) - 1) // 2
+        self.max_radius = limit if max_radius is None else max_radius
+        if not 0 <= self.max_radius <= limit:
+            raise ValueError("max_radius must be between 0 and {}".format(limit))
+        self.rebuild_threshold = rebuild_threshold
+        self.halite = game_map.halite_grid().astype(np.int64)
+        self._pending = []
+        self._pending_cells = None
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Fold the pending changes into the tables.
+        """
+        self._pending = []
+        self._pending_count = 0
+        self._pending_cells = None
+        self._rectangles = _summed_area(np.tile(self.halite, (2, 2)))
+
+        padding = self.max_radius
+        padded = np.pad(self.halite, padding, mode='wrap')
+        padded_height, padded_width = padded.shape
+        ys, xs = np.indices(padded.shape)
+        size = padded_width + padded_height - 1
+        rotated = np.zeros((size, size), dtype=np.int64)
+        rotated[xs + ys, xs - ys + padded_height - 1] = padded
+        self._diamonds = _summed_area(rotated)
+        self._rotation_offset = padded_height - 1
+
+    def update(self, changed_cells):
+        """
+        Apply the halite changes of a frame.
+        :param changed_cells: The rows (x, y, previous halite, halite) of Game.delta.changed_cells
+        """
+        if changed_cells is None or not len(changed_cells):
+            return
+        self.halite[changed_cells[:, 1], changed_cells[:, 0]] = changed_cells[:, 3]
+        self._pending_count += len(changed_cells)
+        if self._pending_count > self.rebuild_threshold:
+            # The tables will be rebuilt from self.halite, the changes need not be kept
+            self._pending = []
+        else:
+            self._pending.append(changed_cells)
+        self._pending_cells = None
+
+    @property
+    def _changes(self):
+        """
+        :return: The pending changes as rows (x, y, change), rebuilding the tables first if there are too many
+        """
+        if self._pending_count > self.rebuild_threshold:
+            self.rebuild()
+        if self._pending_cells is None:
+            if not self._pending:
+                self._pending_cells = np.zeros((0, 3), dtype=np.int64)
+            else:
+                changes = np.concatenate(self._pending)
+                self._pending_cells = np.column_stack((changes[:, 0], changes[:, 1], changes[:, 3] - changes[:, 2]))
+        return self._pending_cells
+
+    @staticmethod
+    def _box(table, top, left, bottom, right):
+        """
+        :return: The sum of the summed-area table's grid over rows top..bottom and columns left..right, inclusive
+        """
+        return (table[bottom + 1, right + 1] - table[top, right + 1]
+                - table[bottom + 1, left] + table[top, left])
+
+    def rect_sum(self, x, y, width, height):
+        """
+        Sum the halite of a rectangle. Accounts for wrap-around.
+        :param x: The x of the top left corner
+        :param y: The y of the top left corner
+        :param width: The number of columns, at most the map width
+        :param height: The number of rows, at most the map height
+        :return: The halite in the rectangle
+        """
+        changes = self._changes
+        left = x % self.width
+        top = y % self.height
+        total = self._box(self._rectangles, top, left, top + height - 1, left + width - 1)
+        if len(changes):
+            inside = ((changes[:, 0] - left) % self.width < width) & ((changes[:, 1] - top) % self.height < height)
+            total += changes[inside, 2].sum()
+        return int(total)
+
+    def diamond_sum(self, position, radius):
+        """
+        Sum the halite within a Manhattan distance of a cell. Accounts for wrap-around.
+        :param position: The center cell
+        :param radius: The Manhattan radius, at most max_radius
+        :return: The halite in the diamond
+        """
+        if not 0 <= radius <= self.max_radius:
+            raise ValueError("radius must be between 0 and {}".format(self.max_radius))
+        changes = self._changes
+        x = position.x % self.width + self.max_radius
+        y = position.y % self.height + self.max_radius
+        u = x + y
+        v = x - y + self._rotation_offset
+        total = self._box(self._diamonds, u - radius, v - radius, u + radius, v + radius)
+        if len(changes):
+            dx = np.abs(changes[:, 0] - position.x % self.width)
+            dy = np.abs(changes[:, 1] - position.y % self.height)
+            distances = np.minimum(dx, self.width - dx) + np.minimum(dy, self.height - dy)
+            total += changes[distances <= radius, 2].sum()
+        return int(total)
+
+    def diamond_sums(self, radius):
+        """
+        Sum the halite within a Manhattan distance of every cell at once. Accounts for wrap-around.
+        :param radius: The Manhattan radius, at most max_radius
+        :return: An int64 array indexed [y, x]
+        """
+        if not 0 <= radius <= self.max_radius:
+            raise ValueError("radius must be between 0 and {}".format(self.max_radius))
+        if len(self._changes):
+            self.rebuild()
+        ys, xs = np.indices((self.height, self.width))
+        u = xs + ys + 2 * self.max_radius
+        v = xs - ys + self._rotation_offset
+        return self._box(self._diamonds, u - radius, v - radius, u + radius, v + radius)
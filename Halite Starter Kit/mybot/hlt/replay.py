@@ -0,0 +1,229 @@
+import argparse
+import atexit
+import io
+import mmap
+import struct
+import subprocess
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from . import common
+
+# First bytes of a replay file
+MAGIC = b"HLTRPL01"
+
+# Last bytes of a replay file: offset of the index, number of segments, MAGIC
+_TRAILER = struct.Struct("<qq8s")
+
+# One index row per segment: turn, then offset and size of the compressed input and output
+_INDEX_COLUMNS = 5
+
+
+class _RecordingInput:
+    """
+    An input stream which keeps a copy of every line read.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.chunks = []
+
+    def readline(self):
+        line = self.stream.readline()
+        self.chunks.append(line)
+        return line
+
+
+class _RecordingOutput:
+    """
+    An output stream which keeps a copy of everything written.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class ReplayRecorder:
+    """
+    Records what a bot reads from and writes to the engine, enabled by passing a path to Game.
+
+    The game is stored as segments: segment 0 is the start-up input and the bot's name,
+    then one segment per turn holds the frame and the commands sent in reply. Every
+    segment is compressed on its own and written as soon as the next one starts, and an
+    index of all segments is appended when the game ends, so a Replay can read any turn
+    without decompressing the others.
+    """
+    def __init__(self, path):
+        """
+        Starts recording the streams of the calling thread (see common.use_streams).
+        :param path: The replay file, overwritten
+        """
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.input = _RecordingInput(common.input_stream())
+        self.output = _RecordingOutput(common.output_stream())
+        self._previous_streams = common.use_streams(self.input, self.output)
+        self._index = []
+        common.at_end_of_input(self.close)
+        atexit.register(self.close)
+
+    def _write(self, chunks):
+        """
+        :return: The offset and size of the compressed chunks in the file
+        """
+        data = zlib.compress(b"".join(chunks))
+        offset = self.file.tell()
+        self.file.write(data)
+        chunks.clear()
+        return offset, len(data)
+
+    def next_segment(self):
+        """
+        Write the current segment out and start the next one. Called by Game before reading a frame.
+        """
+        first_line = self.input.chunks[0].strip() if self.input.chunks else b""
+        if not self._index:
+            turn = 0
+        elif first_line:
+            turn = int(first_line)
+        else:
+            # What was read when the engine closed the input stream
+            turn = -1
+        self._index.append((turn,) + self._write(self.input.chunks) + self._write(self.output.chunks))
+
+    def close(self):
+        """
+        Write the last segment and the index and stop recording. Does nothing when already closed.
+        """
+        if self.file.closed:
+            return
+        if self.input.chunks or self.output.chunks:
+            self.next_segment()
+        index = np.array(self._index, dtype="<i8").reshape(-1, _INDEX_COLUMNS)
+        offset = self.file.tell()
+        self.file.write(index.tobytes())
+        self.file.write(_TRAILER.pack(offset, len(index), MAGIC))
+        self.file.close()
+        common.use_streams(*self._previous_streams)
+
+
+class Replay:
+    """
+    A recorded game, read through a memory map.
+
+    Segments are decompressed on demand, so looking at one turn of a long game only
+    touches that turn's bytes. Use frames to drive a Game over the recorded input
+    without an engine, or run this module to feed the recording to a bot and compare
+    its commands against the recorded ones.
+    """
+    def __init__(self, path):
+        """
+        :param path: A file written by ReplayRecorder
+        """
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC or len(self._map) < len(MAGIC) + _TRAILER.size:
+            raise ValueError("{} is not a replay file".format(path))
+        offset, count, magic = _TRAILER.unpack_from(self._map, len(self._map) - _TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError("{} is incomplete".format(path))
+        self.index = np.frombuffer(self._map[offset:offset + 8 * _INDEX_COLUMNS * count],
+                                   dtype="<i8").reshape(count, _INDEX_COLUMNS)
+        self._segments = {turn: segment for segment, turn in enumerate(self.index[:, 0].tolist())}
+
+    @property
+    def turns(self):
+        """
+        :return: The turn numbers recorded, starting with 0 for the start-up segment and
+                 ending with -1 for the end of input if the game ran to completion
+        """
+        return self.index[:, 0]
+
+    def _read(self, offset, size):
+        return zlib.decompress(self._map[offset:offset + size])
+
+    def input(self, turn):
+        """
+        :param turn: A recorded turn, 0 for the start-up input
+        :return: The raw bytes the bot read for that turn
+        """
+        _, offset, size, _, _ = self.index[self._segments[turn]].tolist()
+        return self._read(offset, size)
+
+    def output(self, turn):
+        """
+        :param turn: A recorded turn, 0 for the bot's name
+        :return: The raw bytes the bot wrote in reply
+        """
+        _, _, _, offset, size = self.index[self._segments[turn]].tolist()
+        return self._read(offset, size)
+
+    def input_bytes(self):
+        """
+        :return: The whole recorded input, as read by the bot
+        """
+        return b"".join(self._read(offset, size) for _, offset, size, _, _ in self.index.tolist())
+
+    def frames(self, start_turn=1, **game_args):
+        """
+        Replays the recorded input through a Game on the calling thread, without an engine.
+        Frames before start_turn are applied but not yielded, which only costs parsing.
+        Commands the game sends are discarded.
+        :param start_turn: The first turn to yield
+        :param game_args: Arguments for Game
+        :return: A generator of the Game after each update_frame from start_turn on
+        """
+        from .networking import Game
+
+        previous = common.use_streams(io.BytesIO(self.input_bytes()), io.BytesIO())
+        try:
+            game = Game(**game_args)
+            for turn in self.turns[1:].tolist():
+                if turn < 0:
+                    break
+                game.update_frame()
+                if turn >= start_turn:
+                    yield game
+        finally:
+            common.use_streams(*previous)
+
+    def close(self):
+        self._map.close()
+
+
+def main(argv=None):
+    """
+    Feeds a replay to a bot at full speed and reports the turns where its commands differ.
+    """
+    parser = argparse.ArgumentParser(prog="python -m hlt.replay",
+                                     description="Replay a recorded game to a bot and compare its commands.")
+    parser.add_argument("replay", help="A replay file written by ReplayRecorder")
+    parser.add_argument("bot", help="The command running the bot, e.g. 'python3 MyBot.py'")
+    args = parser.parse_args(argv)
+
+    replay = Replay(args.replay)
+    start = time.perf_counter()
+    result = subprocess.run(args.bot, shell=True, input=replay.input_bytes(), stdout=subprocess.PIPE)
+    elapsed = time.perf_counter() - start
+
+    lines = result.stdout.splitlines()
+    mismatches = [turn for slot, turn in enumerate(replay.turns.tolist())
+                  if replay.output(turn).strip() != (lines[slot].strip() if slot < len(lines) else b"")]
+    print("{} segments in {:.3f}s, {} differ{}".format(
+        len(replay.turns), elapsed, len(mismatches),
+        ": turns " + " ".join(map(str, mismatches)) if mismatches else ""))
+    replay.close()
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
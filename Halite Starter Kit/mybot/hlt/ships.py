@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class ShipIndex:
+    """
+    Where every ship of every player is, for one frame.
+
+    Built once per frame by Game.update_frame (see Game.ships) and shared by all decision
+    code: ships can be looked up by position, filtered by owner and queried by distance.
+    Distances are wrapped Manhattan distances, i.e. the number of moves between two cells.
+    """
+    def __init__(self, game_map, players):
+        """
+        :param game_map: The game map of this frame
+        :param players: The players, as a dict of player id to Player
+        """
+        self.game_map = game_map
+        self.positions = game_map.positions
+        self.distances = game_map.distances
+        self.ships = [ship for player in players.values() for ship in player.get_ships()]
+        self.indices = np.fromiter((self.positions.index(ship.position) for ship in self.ships),
+                                   dtype=np.int64, count=len(self.ships))
+        self.owners = np.fromiter((ship.owner for ship in self.ships), dtype=np.int16, count=len(self.ships))
+        self._by_cell = dict(zip(self.indices.tolist(), self.ships))
+
+    def __len__(self):
+        return len(self.ships)
+
+    def at(self, position):
+        """
+        :param position: Any position
+        :return: The ship on that cell, or None
+        """
+        return self._by_cell.get(self.positions.index(position))
+
+    def is_occupied(self, position, owner=None):
+        """
+        :param position: Any position
+        :param owner: If given, only consider ships of this player id
+        :return: Whether a ship is on that cell
+        """
+        ship = self._by_cell.get(self.positions.index(position))
+        return ship is not None and (owner is None or ship.owner == owner)
+
+    def _selection(self, owner, exclude):
+        """
+        :return: A boolean array selecting the ships of owner, or of everyone but exclude
+        """
+        selection = np.ones(len(self.ships), dtype=bool)
+        if owner is not None:
+            selection &= self.owners == owner
+        if exclude is not None:
+            selection &= self.owners != exclude
+        return selection
+
+    def owned_by(self, owner=None, exclude=None):
+        """
+        :param owner: If given, only return ships of this player id
+        :param exclude: If given, leave out ships of this player id, e.g. to get opponent ships
+        :return: The list of matching ships
+        """
+        return [self.ships[slot] for slot in np.flatnonzero(self._selection(owner, exclude))]
+
+    def within(self, position, radius, owner=None, exclude=None):
+        """
+        Find the ships at most a number of moves away from a cell.
+        :param position: The center cell
+        :param radius: The largest distance to include
+        :param owner: If given, only return ships of this player id
+        :param exclude: If given, leave out ships of this player id
+        :return: The list of (distance, ship) pairs, closest first
+        """
+        distances = self.distances.field(self.positions.index(position)).ravel()[self.indices]
+        slots = np.flatnonzero((distances <= radius) & self._selection(owner, exclude))
+        slots = slots[np.argsort(distances[slots], kind='stable')]
+        return [(int(distances[slot]), self.ships[slot]) for slot in slots]
+
+    def counts(self, owner=None, exclude=None):
+        """
+        :param owner: If given, only count ships of this player id
+        :param exclude: If given, leave out ships of this player id
+        :return: The number of matching ships on every cell, as an array indexed [y, x]
+        """
+        counts = np.bincount(self.indices[self._selection(owner, exclude)], minlength=self.positions.size)
+        return counts.reshape(self.game_map.height, self.game_map.width)
+
+    def threats(self, player_id, radius):
+        """
+        Count the opponent ships which could reach every cell within a number of moves.
+        :param player_id: The player to count the opponents of
+        :param radius: The number of moves
+        :return: An int64 array indexed [y, x]
+        """
+        return self.distances.diamond_sum(self.counts(exclude=player_id), radius)
@@ -0,0 +1,237 @@
+import numpy as np
+
+from . import constants
+from .positionals import _DIRECTION_SLOTS
+
+# The (dx, dy) offset of every direction slot, ordered as in _DIRECTION_SLOTS
+OFFSETS = np.array(sorted(_DIRECTION_SLOTS, key=_DIRECTION_SLOTS.get), dtype=np.int64)
+
+# The direction slot of staying still
+STILL = _DIRECTION_SLOTS[(0, 0)]
+
+
+def direction_slots(directions):
+    """
+    :param directions: An iterable of Direction tuples
+    :return: The int64 array of their direction slots, as taken by SimState.step
+    """
+    return np.fromiter((_DIRECTION_SLOTS[direction] for direction in directions), dtype=np.int64)
+
+
+class SimState:
+    """
+    A copy of the game state in NumPy arrays which can be stepped forward, for lookahead.
+
+    step applies a turn the way the engine does: dropoff construction, moves paid with
+    1/MOVE_COST_RATIO of the cell's halite, spawns, collisions destroying every ship
+    involved, deposits on the owner's structures and mining with EXTRACT_RATIO, all with
+    inspiration. Ships are rows of the ship_* arrays; they keep their order, except that
+    destroyed ships are removed and spawned ships are appended. copy is a handful of
+    array copies, so a rollout can start from a fresh copy every time.
+    """
+    def __init__(self, halite, structure_owners, shipyards, banks,
+                 ship_ids, ship_owners, ship_xs, ship_ys, ship_halite, turn=0, next_ship_id=None):
+        """
+        :param halite: The int64 halite of every cell, indexed [y, x]
+        :param structure_owners: The owner of the structure on every cell, or -1, indexed [y, x]
+        :param shipyards: An (players, 2) array of the (x, y) of every player's shipyard
+        :param banks: The halite of every player
+        :param ship_ids: The id of every ship
+        :param ship_owners: The owner of every ship
+        :param ship_xs: The x of every ship
+        :param ship_ys: The y of every ship
+        :param ship_halite: The cargo of every ship
+        :param turn: The turn number
+        :param next_ship_id: The id of the next ship spawned, the ones after it counting up like
+                             in the engine. By default spawned ships get negative ids instead.
+        """
+        self.halite = halite
+        self.structure_owners = structure_owners
+        self.shipyards = shipyards
+        self.banks = banks
+        self.ship_ids = ship_ids
+        self.ship_owners = ship_owners
+        self.ship_xs = ship_xs
+        self.ship_ys = ship_ys
+        self.ship_halite = ship_halite
+        self.turn = turn
+        if next_ship_id is None:
+            self._next_spawn_id = -1 - int((-np.minimum(ship_ids, 0)).max(initial=0))
+            self._spawn_id_step = -1
+        else:
+            self._next_spawn_id = next_ship_id
+            self._spawn_id_step = 1
+
+    @staticmethod
+    def from_game(game):
+        """
+        :param game: The Game, after update_frame
+        :return: The state of the current frame. Ship rows follow game.ships.ships.
+        """
+        game_map = game.game_map
+        player_ids = sorted(game.players)
+        structure_owners = np.full((game_map.height, game_map.width), -1, dtype=np.int64)
+        for player in game.players.values():
+            for structure in [player.shipyard] + player.get_dropoffs():
+                structure_owners[structure.position.y, structure.position.x] = player.id
+        ships = game.ships.ships
+        return SimState(
+            halite=game_map.halite_grid().astype(np.int64),
+            structure_owners=structure_owners,
+            shipyards=np.array([(game.players[player_id].shipyard.position.x,
+                                 game.players[player_id].shipyard.position.y) for player_id in player_ids],
+                               dtype=np.int64).reshape(-1, 2),
+            banks=np.array([game.players[player_id].halite_amount for player_id in player_ids], dtype=np.int64),
+            ship_ids=np.array([ship.id for ship in ships], dtype=np.int64),
+            ship_owners=np.array([ship.owner for ship in ships], dtype=np.int64),
+            ship_xs=np.array([ship.position.x for ship in ships], dtype=np.int64),
+            ship_ys=np.array([ship.position.y for ship in ships], dtype=np.int64),
+            ship_halite=np.array([ship.halite_amount for ship in ships], dtype=np.int64),
+            turn=game.turn_number,
+        )
+
+    def copy(self):
+        """
+        :return: An independent copy of this state
+        """
+        state = SimState(self.halite.copy(), self.structure_owners.copy(), self.shipyards, self.banks.copy(),
+                         self.ship_ids.copy(), self.ship_owners.copy(), self.ship_xs.copy(),
+                         self.ship_ys.copy(), self.ship_halite.copy(), self.turn)
+        state._next_spawn_id = self._next_spawn_id
+        state._spawn_id_step = self._spawn_id_step
+        return state
+
+    def rows_of(self, ship_ids, owner):
+        """
+        :param ship_ids: Ship ids of one player
+        :param owner: The player
+        :return: The rows of those ships, -1 for ships which are gone
+        """
+        rows = {ship_id: row for row, ship_id
+                in enumerate(self.ship_ids.tolist()) if self.ship_owners[row] == owner}
+        return np.array([rows.get(ship_id, -1) for ship_id in ship_ids], dtype=np.int64)
+
+    def inspired(self):
+        """
+        :return: For every ship, whether enough opponent ships are close enough to inspire it
+        """
+        if not constants.INSPIRATION_ENABLED or not len(self.ship_ids):
+            return np.zeros(len(self.ship_ids), dtype=bool)
+        height, width = self.halite.shape
+        dx = np.abs(self.ship_xs[:, None] - self.ship_xs[None, :])
+        dy = np.abs(self.ship_ys[:, None] - self.ship_ys[None, :])
+        distances = np.minimum(dx, width - dx) + np.minimum(dy, height - dy)
+        close = (self.ship_owners[:, None] != self.ship_owners[None, :]) & (distances <= constants.INSPIRATION_RADIUS)
+        return close.sum(axis=1) >= constants.INSPIRATION_SHIP_COUNT
+
+    def _keep(self, keep, *extra):
+        """
+        Drop the ships where keep is False.
+        :return: The extra per-ship arrays, filtered the same way
+        """
+        self.ship_ids = self.ship_ids[keep]
+        self.ship_owners = self.ship_owners[keep]
+        self.ship_xs = self.ship_xs[keep]
+        self.ship_ys = self.ship_ys[keep]
+        self.ship_halite = self.ship_halite[keep]
+        return [array[keep] for array in extra]
+
+    def step(self, moves=None, constructs=None, spawns=()):
+        """
+        Advance the state by one turn, in place.
+        :param moves: The direction slot of every ship (see direction_slots), or None for all still
+        :param constructs: A boolean array of the ships turning into dropoffs, or None. These
+                           ships do not move, even when they cannot afford the dropoff.
+        :param spawns: The players spawning a ship
+        :return: The ids of the ships destroyed by collisions
+        """
+        height, width = self.halite.shape
+        count = len(self.ship_ids)
+        moves = np.full(count, STILL, dtype=np.int64) if moves is None else np.asarray(moves, dtype=np.int64)
+        keep = np.ones(count, dtype=bool)
+
+        if constructs is not None:
+            moves = np.where(constructs, STILL, moves)
+            for row in np.flatnonzero(constructs).tolist():
+                x, y, owner = self.ship_xs[row], self.ship_ys[row], self.ship_owners[row]
+                cost = constants.DROPOFF_COST - self.ship_halite[row] - self.halite[y, x]
+                if self.structure_owners[y, x] == -1 and self.banks[owner] >= cost:
+                    self.banks[owner] -= cost
+                    self.halite[y, x] = 0
+                    self.structure_owners[y, x] = owner
+                    keep[row] = False
+
+        # Moves: a ship which cannot pay to leave its cell stays
+        ratios = np.where(self.inspired(), constants.INSPIRED_MOVE_COST_RATIO, constants.MOVE_COST_RATIO)
+        costs = self.halite[self.ship_ys, self.ship_xs] // ratios
+        moved = (moves != STILL) & (self.ship_halite >= costs) & keep
+        offsets = OFFSETS[moves] * moved[:, None]
+        self.ship_halite = self.ship_halite - np.where(moved, costs, 0)
+        self.ship_xs = (self.ship_xs + offsets[:, 0]) % width
+        self.ship_ys = (self.ship_ys + offsets[:, 1]) % height
+        moved, = self._keep(keep, moved)
+        spawned = np.zeros(len(moved), dtype=bool)
+
+        # Spawns land on the shipyard, and may collide there
+        for owner in spawns:
+            if self.banks[owner] >= constants.SHIP_COST:
+                self.banks[owner] -= constants.SHIP_COST
+                x, y = self.shipyards[owner]
+                self.ship_ids = np.append(self.ship_ids, self._next_spawn_id)
+                self.ship_owners = np.append(self.ship_owners, owner)
+                self.ship_xs = np.append(self.ship_xs, x)
+                self.ship_ys = np.append(self.ship_ys, y)
+                self.ship_halite = np.append(self.ship_halite, 0)
+                moved = np.append(moved, False)
+                spawned = np.append(spawned, True)
+                self._next_spawn_id += self._spawn_id_step
+
+        # Collisions destroy every ship involved. Their cargo goes to the owner of the
+        # structure they collided on, or is dropped on the cell.
+        cells = self.ship_ys * width + self.ship_xs
+        _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+        crashed = counts[inverse] > 1
+        destroyed = self.ship_ids[crashed]
+        if crashed.any():
+            xs, ys, cargo = self.ship_xs[crashed], self.ship_ys[crashed], self.ship_halite[crashed]
+            structure_owners = self.structure_owners[ys, xs]
+            on_structure = structure_owners >= 0
+            np.add.at(self.banks, structure_owners[on_structure], cargo[on_structure])
+            np.add.at(self.halite, (ys[~on_structure], xs[~on_structure]), cargo[~on_structure])
+            moved, spawned = self._keep(~crashed, moved, spawned)
+
+        # Deposits on the ship owner's structures
+        structure_owners = self.structure_owners[self.ship_ys, self.ship_xs]
+        home = structure_owners == self.ship_owners
+        np.add.at(self.banks, self.ship_owners[home], self.ship_halite[home])
+        self.ship_halite[home] = 0
+
+        # Mining by ships which stayed on a plain cell
+        mining = ~moved & ~spawned & (structure_owners == -1)
+        inspired = self.inspired()[mining]
+        xs, ys, cargo = self.ship_xs[mining], self.ship_ys[mining], self.ship_halite[mining]
+        ratios = np.where(inspired, constants.INSPIRED_EXTRACT_RATIO, constants.EXTRACT_RATIO)
+        extracted = np.minimum(-(-self.halite[ys, xs] // ratios), constants.MAX_HALITE - cargo)
+        bonus = np.where(inspired, (extracted * constants.INSPIRED_BONUS_MULTIPLIER).astype(np.int64), 0)
+        self.halite[ys, xs] -= extracted
+        self.ship_halite[mining] = np.minimum(cargo + extracted + bonus, constants.MAX_HALITE)
+
+        self.turn += 1
+        return destroyed
+
+    def rollout(self, policy, turns):
+        """
+        Play a policy forward on a copy of this state.
+        :param policy: A function of a SimState returning the moves for step, or a tuple of
+                       step's arguments
+        :param turns: The number of turns to play
+        :return: The state reached
+        """
+        state = self.copy()
+        for _ in range(turns):
+            action = policy(state)
+            if isinstance(action, tuple):
+                state.step(*action)
+            else:
+                state.step(action)
+        return state
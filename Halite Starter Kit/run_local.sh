@@ -0,0 +1,3 @@
+#!/bin/sh
+
+python3 -m engine --width 32 --height 32 "python3 mybot/MyBot.py" "python3 mybot/MyBot.py"
@@ -0,0 +1,25 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The engine and benchmarks live in the kit, the hlt package tested is the one MyBot uses
+KIT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (KIT_DIR, os.path.join(KIT_DIR, 'mybot')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from hlt import constants
+
+
+@pytest.fixture(autouse=True)
+def game_constants():
+    """
+    Load the kit's game constants into hlt.constants for every test.
+    :return: The constants, as read from game_config.json
+    """
+    with open(os.path.join(KIT_DIR, 'game_config.json')) as config:
+        loaded = json.load(config)
+    constants.load_constants(loaded)
+    return loaded
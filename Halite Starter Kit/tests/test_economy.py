@@ -0,0 +1,36 @@
+import io
+
+import numpy as np
+
+from hlt.common import use_streams
+from hlt.economy import Economy
+from hlt.networking import Game
+
+from test_networking import frame_text, init_text
+
+FRAMES = [
+    frame_text(1, [(5000, [(0, 1, 1, 0)], []), (5000, [], [])], [(2, 0, 5)]),
+    # The dropoff appears on a frame which also changes cells
+    frame_text(2, [(4000, [(0, 2, 1, 30)], [(0, 3, 3)]), (5000, [], [])], [(1, 1, 20), (3, 3, 0)]),
+    frame_text(3, [(4000, [(0, 2, 2, 60)], [(0, 3, 3)]), (5000, [], [])], [(2, 1, 40), (0, 3, 100)]),
+]
+
+
+def test_weighted_distance_follows_frames(game_constants, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    text = init_text(game_constants) + "".join(FRAMES)
+    previous_streams = use_streams(io.BytesIO(text.encode()), io.StringIO())
+    try:
+        game = Game()
+        economy = Economy(game)
+        for _ in FRAMES:
+            game.update_frame()
+            economy.update(game.delta.changed_cells)
+            halite = game.game_map.halite_grid()
+            distances, _ = game.game_map.nearest_structure_map(game.me)
+            assert len(game.delta.changed_cells)
+            assert economy.total_halite == halite.sum()
+            assert economy._weighted_distance == (halite * distances).sum()
+            assert np.isfinite(economy.haul_distance)
+    finally:
+        use_streams(*previous_streams)
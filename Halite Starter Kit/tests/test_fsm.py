@@ -0,0 +1,63 @@
+import types
+
+from hlt.fsm import ShipStateMachine
+
+
+class Fleet:
+    """
+    The part of a Player the state machine reads.
+    """
+    def __init__(self, *ship_ids):
+        self.ships = [types.SimpleNamespace(id=ship_id, halite_amount=0) for ship_id in ship_ids]
+
+    def get_ships(self):
+        return self.ships
+
+    def has_ship(self, ship_id):
+        return any(ship.id == ship_id for ship in self.ships)
+
+
+def make_machine(handled):
+    machine = ShipStateMachine('collect')
+    machine.add_transition('collect', 'home', lambda ship: ship.halite_amount >= 100)
+    machine.add_transition('collect', 'stuck', lambda ship: True)
+    machine.add_transition('home', 'collect', lambda ship: ship.halite_amount == 0,
+                           lambda ship: machine.memory(ship).setdefault('trips', 1))
+    for state in ('home', 'collect'):
+        machine.set_handler(state, lambda ships, state=state: handled.append((state, [ship.id for ship in ships])))
+    return machine
+
+
+def test_transitions_and_batches():
+    handled = []
+    machine = make_machine(handled)
+    fleet = Fleet(1, 2, 3)
+    fleet.ships[0].halite_amount = 100
+    machine.run(fleet)
+    # The first transition whose condition holds is taken, at most one per turn
+    assert [machine.state_of(ship) for ship in fleet.ships] == ['home', 'stuck', 'stuck']
+    # Handlers run once per state with all of its ships, in the order they were set
+    assert handled == [('home', [1])]
+
+    handled.clear()
+    fleet.ships[0].halite_amount = 0
+    machine.set_state(fleet.ships[1], 'collect')
+    machine.run(fleet)
+    assert [machine.state_of(ship) for ship in fleet.ships] == ['collect', 'stuck', 'stuck']
+    assert machine.memory(fleet.ships[0]) == {'trips': 1}
+    assert handled == [('collect', [1])]
+    assert machine.ships_in('stuck', fleet.ships) == fleet.ships[1:]
+
+
+def test_lost_ships_are_forgotten():
+    machine = make_machine([])
+    fleet = Fleet(1, 2)
+    machine.run(fleet)
+    machine.memory(fleet.ships[1])['target'] = (3, 4)
+    lost = fleet.ships.pop()
+    machine.run(fleet)
+    assert machine.state_of(lost) is None
+    fleet.ships.append(lost)
+    assert machine.memory(lost) == {}
+    machine.run(fleet)
+    assert machine.state_of(lost) == 'stuck'
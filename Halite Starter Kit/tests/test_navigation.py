@@ -0,0 +1,117 @@
+import heapq
+
+import numpy as np
+
+from hlt import constants
+from hlt.entity import Ship
+from hlt.game_map import GameMap, MapCell
+from hlt.navigation import Navigator
+from hlt.positionals import Direction, PositionTable
+
+
+def make_map(halite):
+    """
+    :param halite: The halite of every cell, indexed [y, x]
+    :return: A GameMap holding it
+    """
+    height, width = halite.shape
+    constants.set_dimensions(width, height)
+    positions = PositionTable.get(width, height)
+    cells = [[MapCell(positions.at(x, y), int(halite[y, x])) for x in range(width)] for y in range(height)]
+    return GameMap(cells, width, height)
+
+
+def forward_costs(game_map, source, turn_cost, occupied_cost):
+    """
+    Dijkstra from a cell along the moves a ship makes.
+    :return: The cost of the cheapest path to every cell index
+    """
+    positions = game_map.positions
+    cells = game_map._flat_cells
+    costs = [float('inf')] * positions.size
+    costs[source] = 0
+    heap = [(0, source)]
+    while heap:
+        cost, index = heapq.heappop(heap)
+        if cost > costs[index]:
+            continue
+        leave = cells[index].halite_amount // constants.MOVE_COST_RATIO + turn_cost
+        for neighbor in positions.neighbors[index]:
+            new_cost = cost + leave + (occupied_cost if cells[neighbor].is_occupied else 0)
+            if new_cost < costs[neighbor]:
+                costs[neighbor] = new_cost
+                heapq.heappush(heap, (new_cost, neighbor))
+    return costs
+
+
+def random_map(seed):
+    rng = np.random.default_rng(seed)
+    game_map = make_map(rng.integers(0, 1000, (7, 9)))
+    for cell in rng.choice(game_map._flat_cells, 10, replace=False):
+        cell.ship = Ship(1, 0, cell.position, 0)
+    return game_map, rng
+
+
+def test_costs_match_forward_search():
+    game_map, rng = random_map(0)
+    navigator = Navigator(game_map)
+    size = game_map.positions.size
+    for source in rng.integers(0, size, 5).tolist():
+        expected = forward_costs(game_map, source, navigator.turn_cost, navigator.occupied_cost)
+        for destination in range(size):
+            assert navigator._cost_to(source, destination) == expected[destination]
+
+
+def test_path_cost():
+    game_map, rng = random_map(1)
+    navigator = Navigator(game_map)
+    positions = game_map.positions
+    cells = game_map._flat_cells
+    for source, destination in rng.integers(0, positions.size, (20, 2)).tolist():
+        path = navigator.path(positions.positions[source], positions.positions[destination])
+        cost = 0
+        index = source
+        for position in path:
+            assert positions.index(position) in positions.neighbors[index]
+            cost += cells[index].halite_amount // constants.MOVE_COST_RATIO + navigator.turn_cost
+            index = positions.index(position)
+            cost += navigator.occupied_cost if cells[index].is_occupied else 0
+        assert index == destination
+        assert cost == forward_costs(game_map, source, navigator.turn_cost, navigator.occupied_cost)[destination]
+
+
+def test_ranked_moves():
+    game_map, rng = random_map(2)
+    navigator = Navigator(game_map)
+    positions = game_map.positions
+    for source, destination in rng.integers(0, positions.size, (20, 2)).tolist():
+        ship = Ship(0, 0, positions.positions[source], 1000)
+        moves = navigator.ranked_moves(ship, positions.positions[destination])
+        if source == destination:
+            assert moves == [Direction.Still]
+            continue
+        assert moves[-1] == Direction.Still and sorted(moves[:-1]) == sorted(Direction.get_all_cardinals())
+        # The first move starts a cheapest path
+        first = positions.index(ship.position.directional_offset(moves[0]))
+        cells = game_map._flat_cells
+        step = cells[source].halite_amount // constants.MOVE_COST_RATIO + navigator.turn_cost \
+            + (navigator.occupied_cost if cells[first].is_occupied else 0)
+        expected = forward_costs(game_map, source, navigator.turn_cost, navigator.occupied_cost)
+        assert step + forward_costs(game_map, first, navigator.turn_cost, navigator.occupied_cost)[destination] \
+            == expected[destination]
+
+    # A ship which cannot pay to move stays
+    cell = max(game_map._flat_cells, key=lambda cell: cell.halite_amount)
+    ship = Ship(0, 0, cell.position, 0)
+    assert navigator.ranked_moves(ship, positions.at(cell.position.x + 2, cell.position.y)) == [Direction.Still]
+
+
+def test_out_of_time():
+    game_map = make_map(np.zeros((20, 20), dtype=np.int64))
+    navigator = Navigator(game_map, time_budget=0)
+    positions = game_map.positions
+    source, destination = positions.at(0, 0), positions.at(10, 5)
+    assert navigator.path(source, destination) is None
+    # Falls back to the unsafe moves of GameMap
+    assert navigator.ranked_moves(Ship(0, 0, source, 0), destination) \
+        == game_map.get_unsafe_moves(source, destination) + [Direction.Still]
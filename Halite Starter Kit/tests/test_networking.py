@@ -0,0 +1,90 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from hlt.common import use_streams
+from hlt.networking import Game
+
+HALITE = np.arange(16, dtype=np.int64).reshape(4, 4) * 10
+
+
+def init_text(config):
+    lines = [json.dumps(config), "2 0", "0 0 0", "1 2 2", "4 4"]
+    lines += [" ".join(map(str, row)) for row in HALITE.tolist()]
+    return "\n".join(lines) + "\n"
+
+
+def frame_text(turn, players, cells):
+    """
+    :param players: (halite, ships as (id, x, y, cargo), dropoffs as (id, x, y)) of both players
+    :param cells: (x, y, halite) of the changed cells
+    """
+    lines = [str(turn)]
+    for player_id, (halite, ships, dropoffs) in enumerate(players):
+        lines.append("{} {} {} {}".format(player_id, len(ships), len(dropoffs), halite))
+        lines += [" ".join(map(str, ship)) for ship in ships]
+        lines += [" ".join(map(str, dropoff)) for dropoff in dropoffs]
+    lines.append(str(len(cells)))
+    lines += [" ".join(map(str, cell)) for cell in cells]
+    return "\n".join(lines) + "\n"
+
+
+FRAMES = [
+    frame_text(1, [(5000, [(0, 1, 1, 0)], []), (5000, [], [])], []),
+    frame_text(2, [(4000, [(0, 2, 1, 30), (1, 0, 0, 0)], []), (5000, [(2, 2, 2, 0)], [(0, 3, 3)])],
+               [(1, 1, 20), (3, 3, 0)]),
+    frame_text(3, [(4000, [(1, 0, 0, 0)], []), (5000, [(2, 2, 2, 0)], [(0, 3, 3)])], []),
+]
+
+
+@pytest.fixture
+def game(game_constants, tmp_path, monkeypatch, request):
+    """
+    A Game reading FRAMES, with the map kind given by the test's parameter.
+    """
+    monkeypatch.chdir(tmp_path)
+    text = init_text(game_constants) + "".join(FRAMES)
+    previous_streams = use_streams(io.BytesIO(text.encode()), io.BytesIO())
+    yield Game(array_map=request.param)
+    use_streams(*previous_streams)
+
+
+@pytest.mark.parametrize('game', [False, True], indirect=True)
+def test_frame_deltas(game):
+    game.update_frame()
+    ship = game.me.get_ship(0)
+    assert game.delta.new_ships == [ship] and game.delta.changed_cells.shape == (0, 4)
+    assert game.game_map[ship.position].ship is ship
+
+    game.update_frame()
+    delta = game.delta
+    assert delta.new_ships == [game.me.get_ship(1), game.players[1].get_ship(2)]
+    assert delta.moved_ships == [(ship, game.game_map.positions.at(1, 1))] and ship.halite_amount == 30
+    assert delta.new_dropoffs == [game.players[1].get_dropoff(0)] and delta.destroyed_ships == []
+    assert delta.changed_cells.tolist() == [[1, 1, 50, 20], [3, 3, 150, 0]]
+    assert game.game_map[game.game_map.positions.at(1, 1)].halite_amount == 20
+    assert game.game_map[game.game_map.positions.at(3, 3)].has_structure
+    # Only the cells with ships this turn are marked
+    assert game.game_map[game.game_map.positions.at(1, 1)].ship is None
+    assert game.game_map[ship.position].ship is ship
+
+    game.update_frame()
+    assert game.delta.destroyed_ships == [ship] and game.delta.new_ships == [] and game.delta.moved_ships == []
+    assert game.delta.changed_cells.shape == (0, 4)
+    assert not game.me.has_ship(0) and game.me.get_ships() == [game.me.get_ship(1)]
+    assert game.game_map[ship.position].ship is None
+
+
+@pytest.mark.parametrize('game', [False], indirect=True)
+def test_registry_evicts_destroyed_ships(game):
+    game.update_frame()
+    game.update_frame()
+    ship = game.me.get_ship(0)
+    assert len(game.registry) == 3 and game.registry.get(0, 0) is ship
+    game.update_frame()
+    assert len(game.registry) == 2 and (0, 0) not in game.registry
+    assert game.registry.get(1, 2) is game.players[1].get_ship(2)
+    # Every player of the game shares its registry
+    assert all(player._registry is game.registry for player in game.players.values())
@@ -0,0 +1,131 @@
+import numpy as np
+
+from hlt import constants
+from hlt.entity import Ship
+from hlt.game_map import GameMap, MapCell
+from hlt.planner import MovePlanner
+from hlt.positionals import Direction, PositionTable
+
+DIRECTIONS = Direction.get_all_cardinals() + [Direction.Still]
+
+
+def make_map(halite):
+    """
+    :param halite: The halite of every cell, indexed [y, x]
+    :return: A GameMap holding it
+    """
+    height, width = halite.shape
+    constants.set_dimensions(width, height)
+    positions = PositionTable.get(width, height)
+    cells = [[MapCell(positions.at(x, y), int(halite[y, x])) for x in range(width)] for y in range(height)]
+    return GameMap(cells, width, height)
+
+
+def destinations(planner, ships):
+    return [planner.positions.index(planner.destination_of(ship)) for ship in ships]
+
+
+def test_destinations_are_distinct():
+    rng = np.random.default_rng(0)
+    for allow_swaps in (True, False):
+        for _ in range(50):
+            game_map = make_map(rng.integers(0, 100, (6, 6)))
+            positions = game_map.positions
+            cells = rng.choice(positions.size, rng.integers(1, 30), replace=False).tolist()
+            ships = [Ship(0, ship_id, positions.positions[cell], int(rng.integers(0, 20)))
+                     for ship_id, cell in enumerate(cells)]
+            planner = MovePlanner(game_map, allow_swaps=allow_swaps)
+            requested = {}
+            for ship in ships:
+                directions = [DIRECTIONS[slot] for slot in rng.permutation(5)[:rng.integers(0, 6)]]
+                requested[ship.id] = {positions.index(ship.position.directional_offset(direction))
+                                      for direction in directions}
+                planner.request(ship, directions)
+            commands = planner.resolve()
+
+            assert len(commands) == len(ships)
+            targets = destinations(planner, ships)
+            assert len(set(targets)) == len(targets)
+            for ship, target in zip(ships, targets):
+                source = positions.index(ship.position)
+                assert target == source or target in requested[ship.id]
+                if target != source:
+                    # Only ships which can pay move
+                    assert ship.halite_amount >= game_map[ship.position].halite_amount // constants.MOVE_COST_RATIO
+
+
+def test_blocked_ship_pushes_back_the_one_behind():
+    game_map = make_map(np.zeros((5, 5), dtype=np.int64))
+    positions = game_map.positions
+    behind = Ship(0, 0, positions.at(0, 1), 0)
+    blocker = Ship(0, 1, positions.at(2, 1), 0)
+    front = Ship(0, 2, positions.at(1, 1), 0)
+    planner = MovePlanner(game_map)
+    # behind gets front's cell before front finds its own way blocked
+    planner.request(behind, [Direction.East])
+    planner.request(blocker, [])
+    planner.request(front, [Direction.East])
+    planner.resolve()
+    assert destinations(planner, [behind, blocker, front]) == [positions.index(ship.position)
+                                                              for ship in (behind, blocker, front)]
+
+
+def test_ships_in_a_row_move_together():
+    game_map = make_map(np.zeros((5, 5), dtype=np.int64))
+    positions = game_map.positions
+    ships = [Ship(0, ship_id, positions.at(ship_id, 1), 0) for ship_id in range(4)]
+    planner = MovePlanner(game_map)
+    for ship in ships:
+        planner.request(ship, [Direction.East])
+    assert planner.resolve() == [ship.move(Direction.East) for ship in ships]
+
+
+def test_swaps():
+    game_map = make_map(np.zeros((5, 5), dtype=np.int64))
+    positions = game_map.positions
+    for allow_swaps in (True, False):
+        west = Ship(0, 0, positions.at(1, 1), 0)
+        east = Ship(0, 1, positions.at(2, 1), 0)
+        planner = MovePlanner(game_map, allow_swaps=allow_swaps)
+        planner.request(west, [Direction.East])
+        planner.request(east, [Direction.West])
+        planner.resolve()
+        if allow_swaps:
+            assert (planner.destination_of(west), planner.destination_of(east)) == (east.position, west.position)
+        else:
+            assert (planner.destination_of(west), planner.destination_of(east)) == (west.position, east.position)
+
+
+def test_reserved_cells():
+    game_map = make_map(np.zeros((5, 5), dtype=np.int64))
+    positions = game_map.positions
+    center = positions.at(2, 2)
+    ships = [Ship(0, 0, positions.at(1, 2), 0), Ship(0, 1, positions.at(3, 2), 0), Ship(0, 2, center, 0)]
+
+    planner = MovePlanner(game_map)
+    planner.reserve(center)
+    planner.request(ships[0], [Direction.East])
+    planner.request(ships[1], [Direction.West])
+    # A ship on a reserved cell may still stay there
+    planner.request(ships[2], [])
+    planner.resolve()
+    assert destinations(planner, ships) == [positions.index(ship.position) for ship in ships]
+
+
+def test_shared_cells():
+    game_map = make_map(np.zeros((5, 5), dtype=np.int64))
+    positions = game_map.positions
+    center = positions.at(2, 2)
+    directions = Direction.get_all_cardinals()
+    for shared in (False, True):
+        ships = [Ship(0, ship_id, center.directional_offset(direction), 0)
+                 for ship_id, direction in enumerate(directions)]
+        planner = MovePlanner(game_map)
+        if shared:
+            planner.share(center)
+        # Every ship heads for the center
+        for ship, direction in zip(ships, directions):
+            planner.request(ship, [Direction.invert(direction)])
+        planner.resolve()
+        arrived = [planner.destination_of(ship) == center for ship in ships]
+        assert sum(arrived) == (4 if shared else 1)
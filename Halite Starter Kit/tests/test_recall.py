@@ -0,0 +1,57 @@
+import types
+
+import numpy as np
+
+from hlt import constants
+from hlt.entity import Dropoff, Ship, Shipyard
+from hlt.navigation import ReturnPlanner
+from hlt.recall import RecallScheduler
+
+from test_planner import make_map
+
+
+def make_game(ships, dropoffs=(), turn_number=1):
+    """
+    A 16x16 game with your shipyard at (0, 0).
+    :param ships: (x, y, cargo) of your ships
+    :param dropoffs: (x, y) of your dropoffs
+    """
+    game_map = make_map(np.zeros((16, 16), dtype=np.int64))
+    positions = game_map.positions
+    ships = [Ship(0, ship_id, positions.at(x, y), cargo) for ship_id, (x, y, cargo) in enumerate(ships)]
+    dropoffs = [Dropoff(0, dropoff_id, positions.at(x, y)) for dropoff_id, (x, y) in enumerate(dropoffs)]
+    me = types.SimpleNamespace(shipyard=Shipyard(0, -1, positions.at(0, 0)),
+                               get_ships=lambda: ships, get_dropoffs=lambda: dropoffs)
+    game = types.SimpleNamespace(game_map=game_map, me=me, turn_number=turn_number)
+    return game, RecallScheduler(game, ReturnPlanner(game_map, me))
+
+
+def test_arrivals_are_staggered():
+    # Ship i is i + 1 moves from the shipyard, the last one carries nothing
+    game, recall = make_game([(i + 1, 0, 100) for i in range(7)] + [(0, 3, 0)])
+    last = constants.MAX_TURNS
+    # The four farthest ships arrive together on the last turn, the others one per turn before
+    assert [recall.arrivals[ship_id] for ship_id in range(7)] == [last - 3, last - 2, last - 1] + [last] * 4
+    assert recall.latest_start(game.me.get_ships()[7]) is None
+    for ship in game.me.get_ships()[:7]:
+        distance = ship.position.x
+        assert recall.latest_start(ship) == recall.arrivals[ship.id] - int(np.ceil(distance * 1.2)) - 2 + 1
+
+
+def test_queues_per_structure():
+    ships = [(1, 0, 100), (2, 0, 100), (8, 9, 100), (8, 10, 100), (8, 11, 100), (8, 12, 100), (8, 13, 100)]
+    game, recall = make_game(ships, dropoffs=[(8, 8)])
+    last = constants.MAX_TURNS
+    assert [recall.arrivals[ship_id] for ship_id in range(7)] == [last, last, last - 1] + [last] * 4
+
+
+def test_should_recall():
+    game, recall = make_game([(5, 0, 100)])
+    ship = game.me.get_ships()[0]
+    start = recall.latest_start(ship)
+    game.turn_number = start - 1
+    assert not recall.should_recall(ship) and not recall.is_last_turn
+    game.turn_number = start
+    assert recall.should_recall(ship)
+    game.turn_number = constants.MAX_TURNS
+    assert recall.is_last_turn
@@ -0,0 +1,96 @@
+import types
+
+import numpy as np
+import pytest
+
+from hlt import constants
+from hlt.dropoffs import DropoffPlanner
+from hlt.positionals import Position
+from hlt.regions import HaliteSums
+
+
+class HaliteGrid:
+    """
+    The part of a game map HaliteSums reads.
+    """
+    def __init__(self, halite):
+        self.halite = halite
+        self.height, self.width = halite.shape
+
+    def halite_grid(self):
+        return self.halite
+
+
+def brute_rect(halite, x, y, width, height):
+    rows = [(y + dy) % halite.shape[0] for dy in range(height)]
+    columns = [(x + dx) % halite.shape[1] for dx in range(width)]
+    return int(halite[np.ix_(rows, columns)].sum())
+
+
+def brute_diamonds(halite, radius):
+    total = np.zeros_like(halite)
+    for dy in range(-radius, radius + 1):
+        for dx in range(abs(dy) - radius, radius - abs(dy) + 1):
+            total += np.roll(halite, (-dy, -dx), axis=(0, 1))
+    return total
+
+
+def random_changes(halite, rng, count):
+    """
+    Change the halite of some distinct cells.
+    :return: The changed cells as rows (x, y, previous halite, halite)
+    """
+    height, width = halite.shape
+    cells = rng.choice(width * height, count, replace=False)
+    ys, xs = cells // width, cells % width
+    current = rng.integers(0, 1000, count)
+    changed = np.column_stack((xs, ys, halite[ys, xs], current))
+    halite[ys, xs] = current
+    return changed
+
+
+def test_sums_follow_changes():
+    rng = np.random.default_rng(0)
+    halite = rng.integers(0, 1000, (8, 11))
+    constants.set_dimensions(11, 8)
+    sums = HaliteSums(HaliteGrid(halite.copy()), rebuild_threshold=20)
+    for count in (0, 3, 5, 30, 8):
+        sums.update(random_changes(halite, rng, count))
+        for _ in range(20):
+            x, y = rng.integers(-20, 20, 2)
+            width, height = rng.integers(1, 12), rng.integers(1, 9)
+            assert sums.rect_sum(x, y, width, height) == brute_rect(halite, x, y, width, height)
+        for radius in range(sums.max_radius + 1):
+            expected = brute_diamonds(halite, radius)
+            for x, y in zip(rng.integers(0, 11, 10).tolist(), rng.integers(0, 8, 10).tolist()):
+                assert sums.diamond_sum(Position(x, y), radius) == expected[y, x]
+        for radius in range(sums.max_radius + 1):
+            assert (sums.diamond_sums(radius) == brute_diamonds(halite, radius)).all()
+
+
+def test_updates_without_queries():
+    rng = np.random.default_rng(2)
+    halite = rng.integers(0, 1000, (8, 11))
+    sums = HaliteSums(HaliteGrid(halite.copy()), rebuild_threshold=20)
+    for _ in range(50):
+        sums.update(random_changes(halite, rng, 3))
+        assert sum(map(len, sums._pending)) <= 20
+    assert (sums.diamond_sums(3) == brute_diamonds(halite, 3)).all()
+
+
+def test_radius_limit():
+    sums = HaliteSums(HaliteGrid(np.zeros((8, 11), dtype=np.int64)))
+    assert sums.max_radius == 3
+    with pytest.raises(ValueError):
+        sums.diamond_sums(4)
+    with pytest.raises(ValueError):
+        HaliteSums(HaliteGrid(np.zeros((8, 11), dtype=np.int64)), max_radius=4)
+
+
+def test_dropoff_density():
+    rng = np.random.default_rng(1)
+    halite = rng.integers(0, 1000, (16, 16))
+    planner = DropoffPlanner(types.SimpleNamespace(game_map=HaliteGrid(halite.copy()), players={}), radius=5)
+    for count in (4, 100, 1):
+        planner.update(random_changes(halite, rng, count))
+        assert (planner.density == brute_diamonds(halite, 5)).all()
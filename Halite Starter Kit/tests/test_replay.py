@@ -0,0 +1,54 @@
+import io
+
+from hlt.common import use_streams
+from hlt.networking import Game
+from hlt.replay import Replay
+
+from test_networking import FRAMES, init_text
+
+
+def record(path, config):
+    """
+    Play FRAMES with a recording Game, sending the turn number as the commands.
+    :return: The recorded input
+    """
+    text = (init_text(config) + "".join(FRAMES)).encode()
+    previous_streams = use_streams(io.BytesIO(text), io.BytesIO())
+    try:
+        game = Game(replay_path=str(path))
+        game.ready("Recorded")
+        for _ in FRAMES:
+            game.update_frame()
+            game.end_turn(["turn", str(game.turn_number)])
+        game.recorder.close()
+    finally:
+        use_streams(*previous_streams)
+    return text
+
+
+def test_round_trip(game_constants, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    text = record(tmp_path / "game.rpl", game_constants)
+    replay = Replay(str(tmp_path / "game.rpl"))
+    assert replay.turns.tolist() == [0, 1, 2, 3]
+    assert replay.input_bytes() == text
+    assert replay.input(0) == init_text(game_constants).encode()
+    assert replay.output(0) == b"Recorded\n"
+    for turn, frame in enumerate(FRAMES, 1):
+        assert replay.input(turn) == frame.encode()
+        assert replay.output(turn) == "turn {}\n".format(turn).encode()
+    replay.close()
+
+
+def test_frames_from_a_turn(game_constants, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    record(tmp_path / "game.rpl", game_constants)
+    replay = Replay(str(tmp_path / "game.rpl"))
+    turns = []
+    for game in replay.frames(start_turn=2):
+        turns.append(game.turn_number)
+        # Earlier frames were applied too
+        assert game.me.get_ship(1).position == game.game_map.positions.at(0, 0)
+    assert turns == [2, 3]
+    assert not game.me.has_ship(0)
+    replay.close()
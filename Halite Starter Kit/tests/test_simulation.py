@@ -0,0 +1,142 @@
+import numpy as np
+
+from engine.game import Engine, _DIRECTIONS
+from hlt import constants
+from hlt.positionals import Direction
+from hlt.simulation import STILL, SimState, direction_slots
+
+
+def make_state(ships, size=8, halite=0, shipyards=((0, 0), (4, 4)), dropoffs=(), banks=(5000, 5000)):
+    """
+    :param ships: (id, owner, x, y, cargo) of every ship
+    :param halite: The halite of every cell
+    :param dropoffs: (owner, x, y) of every dropoff
+    :return: A SimState of a size x size map
+    """
+    structure_owners = np.full((size, size), -1, dtype=np.int64)
+    for owner, (x, y) in enumerate(shipyards):
+        structure_owners[y, x] = owner
+    for owner, x, y in dropoffs:
+        structure_owners[y, x] = owner
+    columns = np.array(ships, dtype=np.int64).reshape(-1, 5).T
+    return SimState(np.full((size, size), halite, dtype=np.int64), structure_owners,
+                    np.array(shipyards, dtype=np.int64), np.array(banks, dtype=np.int64), *columns)
+
+
+def moves(*directions):
+    return direction_slots(directions)
+
+
+def test_move_is_paid_from_cargo():
+    state = make_state([(0, 0, 2, 2, 20), (1, 1, 6, 6, 5)], halite=100)
+    state.step(moves(Direction.East, Direction.East))
+    # 100 // MOVE_COST_RATIO is 10: the first ship pays it, the second cannot and stays
+    assert state.ship_xs.tolist() == [3, 6]
+    assert state.ship_halite.tolist() == [10, 5 + 25]
+
+
+def test_collision_destroys_ships_and_drops_cargo():
+    state = make_state([(0, 0, 2, 2, 300), (1, 1, 4, 2, 200)])
+    destroyed = state.step(moves(Direction.East, Direction.West))
+    assert sorted(destroyed.tolist()) == [0, 1]
+    assert len(state.ship_ids) == 0
+    assert state.halite[2, 3] == 500
+
+
+def test_collision_on_structure_pays_its_owner():
+    state = make_state([(0, 0, 3, 4, 300), (1, 1, 5, 4, 200)])
+    state.step(moves(Direction.East, Direction.West))
+    assert state.banks.tolist() == [5000, 5500]
+
+
+def test_deposit_on_own_structures_only():
+    state = make_state([(0, 0, 1, 0, 300), (1, 1, 2, 2, 200)], dropoffs=[(1, 3, 2)])
+    state.step(moves(Direction.West, Direction.East))
+    assert state.banks.tolist() == [5300, 5200]
+    assert state.ship_halite.tolist() == [0, 0]
+
+
+def test_mining_and_inspiration():
+    state = make_state([(0, 0, 2, 2, 0), (1, 1, 3, 2, 0), (2, 1, 2, 3, 0)], halite=100)
+    state.step()
+    # Ship 0 has two opponents within INSPIRATION_RADIUS: it mines a quarter of the cell
+    # and gets the bonus on top. The others have a single opponent close by.
+    extracted = -(-100 // constants.INSPIRED_EXTRACT_RATIO)
+    assert state.ship_halite[0] == extracted * (1 + constants.INSPIRED_BONUS_MULTIPLIER)
+    assert state.ship_halite[1:].tolist() == [-(-100 // constants.EXTRACT_RATIO)] * 2
+    assert state.halite[2, 2] == 100 - extracted
+
+
+def test_dropoff_construction():
+    state = make_state([(0, 0, 2, 2, 300), (1, 1, 6, 6, 0)], halite=700, banks=(5000, 1000))
+    state.step(constructs=np.array([True, True]))
+    assert state.banks.tolist() == [5000 - (constants.DROPOFF_COST - 300 - 700), 1000]
+    assert state.ship_ids.tolist() == [1]
+    assert state.structure_owners[2, 2] == 0 and state.halite[2, 2] == 0
+
+
+def test_spawn_ids():
+    state = make_state([(5, 0, 2, 2, 0)])
+    state.step(spawns=[0])
+    assert state.ship_ids.tolist() == [5, -1]
+    assert state.banks[0] == 5000 - constants.SHIP_COST
+
+    state = make_state([(5, 0, 2, 2, 0)])
+    counting = SimState(state.halite, state.structure_owners, state.shipyards, state.banks, state.ship_ids,
+                        state.ship_owners, state.ship_xs, state.ship_ys, state.ship_halite, next_ship_id=6)
+    counting.step(spawns=[0, 1])
+    assert counting.ship_ids.tolist() == [5, 6, 7]
+
+
+def random_commands(engine, rng):
+    """
+    :return: Random engine commands for every player
+    """
+    commands = {}
+    for player_id in range(len(engine.bots)):
+        owned = engine.ship_ids[engine.ship_owners == player_id].tolist()
+        moves = {ship_id: _DIRECTIONS["nsewo"[rng.integers(5)]] for ship_id in owned if rng.random() < 0.4}
+        constructs = [ship_id for ship_id in owned if ship_id not in moves and rng.random() < 0.01]
+        commands[player_id] = (moves, constructs, rng.random() < 0.15)
+    return commands
+
+
+def step_arguments(state, commands):
+    """
+    :param commands: Engine commands for every player
+    :return: The moves, constructs and spawns arguments of state.step for them
+    """
+    rows = {ship_id: row for row, ship_id in enumerate(state.ship_ids.tolist())}
+    slots = np.full(len(rows), STILL)
+    constructs = np.zeros(len(rows), dtype=bool)
+    for moves, player_constructs, _ in commands.values():
+        for ship_id, (dx, dy) in moves.items():
+            slots[rows[ship_id]] = direction_slots([(dx, dy)])[0]
+        constructs[[rows[ship_id] for ship_id in player_constructs]] = True
+    return slots, constructs, [player_id for player_id, (_, _, spawn) in commands.items() if spawn]
+
+
+def test_step_matches_engine(game_constants):
+    """
+    Random commands played by the engine and stepped by a SimState started from the same game.
+    """
+    game_constants = dict(game_constants, INITIAL_ENERGY=200000)
+    for seed, players in [(0, 2), (1, 4)]:
+        rng = np.random.default_rng(seed)
+        engine = Engine([None] * players, 32, 32, seed=seed, constants=game_constants)
+        state = SimState(engine.halite.copy(), engine.structure_owners.copy(), np.array(engine.shipyards),
+                         engine.banks.copy(), engine.ship_ids.copy(), engine.ship_owners.copy(),
+                         engine.ship_xs.copy(), engine.ship_ys.copy(), engine.ship_halite.copy(), next_ship_id=0)
+        for _ in range(1200):
+            commands = random_commands(engine, rng)
+            state.step(*step_arguments(state, commands))
+            engine._process(commands)
+            for name in ('ship_ids', 'ship_owners', 'ship_xs', 'ship_ys', 'ship_halite', 'halite', 'banks',
+                         'structure_owners'):
+                assert (getattr(state, name) == getattr(engine, name)).all(), name
+
+            cells = state.ship_ys * 32 + state.ship_xs
+            assert len(np.unique(cells)) == len(cells)
+            assert (state.halite >= 0).all()
+            assert ((state.ship_halite >= 0) & (state.ship_halite <= constants.MAX_HALITE)).all()
+        assert sum(map(len, engine.dropoffs)) == (state.structure_owners >= 0).sum() - players > 0